@@ -1,13 +1,31 @@
 #Done By Dacorie Smith
 
+import hashlib
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
 
 class AzureBlobUploader:
-    def __init__(self, connection_string, container_name):
+    # Files at least this large are sent as BLOCK_SIZE blocks uploaded in parallel; the client's
+    # max_single_put_size is set to match, as the SDK's default (64 MiB) would send them in one request
+    LARGE_FILE_SIZE = 8 * 1024 * 1024
+    BLOCK_SIZE = 4 * 1024 * 1024
+    TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+    MD5_METADATA_KEY = 'content_md5'
+
+    def __init__(self, connection_string, container_name, max_retries=3, backoff_factor=1.0,
+                 blob_service_client=None):
         self.connection_string = connection_string
         self.container_name = container_name
-        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # A prebuilt client (e.g. one pointed at Azurite, or a fake) can be passed in for testing; it
+        # should be created with the same max_single_put_size and max_block_size settings
+        self.blob_service_client = blob_service_client or BlobServiceClient.from_connection_string(
+            self.connection_string, max_single_put_size=self.LARGE_FILE_SIZE, max_block_size=self.BLOCK_SIZE)
         self.container_client = self.get_or_create_container()
 
     def get_or_create_container(self):
@@ -20,20 +38,134 @@ class AzureBlobUploader:
             container_client = self.blob_service_client.create_container(self.container_name)
         return container_client
 
-    def upload_file_to_blob(self, file_path, blob_name):
-        """Uploads a file from local storage to Azure Blob Storage."""
+    def is_transient(self, error):
+        """Network failures and throttling/server errors are worth retrying; anything else is not."""
+        if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+            return True
+        return isinstance(error, HttpResponseError) and error.status_code in self.TRANSIENT_STATUS_CODES
+
+    def upload_file_to_blob(self, file_path, blob_name, max_concurrency=1, metadata=None):
+        """Uploads a file from local storage to Azure Blob Storage, retrying transient failures with backoff.
+
+        Files sent in one request are retried here, with the SDK's own retries turned off for the call.
+        Files sent in blocks are left to the SDK, which retries just the failed block instead of the file.
+        """
         blob_client = self.container_client.get_blob_client(blob_name)
-        with open(file_path, "rb") as data:
-            blob_client.upload_blob(data, overwrite=True)
+        in_blocks = os.path.getsize(file_path) >= self.LARGE_FILE_SIZE
+        attempts = 1 if in_blocks else self.max_retries + 1
+        for attempt in range(attempts):
+            try:
+                with open(file_path, "rb") as data:
+                    blob_client.upload_blob(data, overwrite=True, max_concurrency=max_concurrency, metadata=metadata,
+                                            retry_total=self.max_retries if in_blocks else 0)
+                break
+            except Exception as e:
+                if attempt == attempts - 1 or not self.is_transient(e):
+                    raise
+                delay = self.backoff_factor * (2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"Retrying {blob_name} in {delay:.1f}s after: {e}")
+                time.sleep(delay)
         print(f"Uploaded: {blob_name}")
 
-    def upload_folder_to_blob(self, folder_path):
-        """Upload all files from a local folder to Azure Blob Storage."""
+    def list_local_files(self, folder_path):
+        """Returns (file_path, blob_name) for every file under folder_path."""
+        local_files = []
         for root, dirs, files in os.walk(folder_path):
             for file in files:
                 file_path = os.path.join(root, file)
                 blob_name = os.path.relpath(file_path, folder_path).replace("\\", "/")
-                self.upload_file_to_blob(file_path, blob_name)
+                local_files.append((file_path, blob_name))
+        return local_files
+
+    def upload_files(self, local_files, workers=1, max_concurrency=4):
+        """Uploads (file_path, blob_name) pairs with a bounded worker pool and reports the throughput.
+
+        Large files additionally use max_concurrency parallel block uploads. A failed file is
+        reported and does not stop the others.
+        """
+        start = time.perf_counter()
+        uploaded_files = 0
+        uploaded_bytes = 0
+        failed = []
+
+        def upload(file_path, blob_name):
+            size = os.path.getsize(file_path)
+            # The content hash travels with the blob so a later sync can tell it is unchanged
+            metadata = {self.MD5_METADATA_KEY: self.file_md5(file_path)}
+            self.upload_file_to_blob(file_path, blob_name, metadata=metadata,
+                                     max_concurrency=max_concurrency if size >= self.LARGE_FILE_SIZE else 1)
+            return size
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(upload, file_path, blob_name): blob_name for file_path, blob_name in local_files}
+            for future in as_completed(futures):
+                try:
+                    uploaded_bytes += future.result()
+                    uploaded_files += 1
+                except Exception as e:
+                    failed.append(futures[future])
+                    print(f"Error uploading {futures[future]}: {e}")
+
+        elapsed = time.perf_counter() - start
+        report = {
+            'files': uploaded_files,
+            'bytes': uploaded_bytes,
+            'failed': failed,
+            'seconds': elapsed,
+            'files_per_sec': uploaded_files / elapsed if elapsed else 0.0,
+            'mb_per_sec': uploaded_bytes / (1024 * 1024) / elapsed if elapsed else 0.0,
+        }
+        print(f"Uploaded {uploaded_files} files ({uploaded_bytes / (1024 * 1024):.1f} MB) in {elapsed:.2f}s: "
+              f"{report['files_per_sec']:.1f} files/s, {report['mb_per_sec']:.2f} MB/s, {len(failed)} failed")
+        return report
+
+    def upload_folder_to_blob(self, folder_path, workers=1, max_concurrency=4):
+        """Upload all files from a local folder to Azure Blob Storage."""
+        return self.upload_files(self.list_local_files(folder_path), workers=workers, max_concurrency=max_concurrency)
+
+    @staticmethod
+    def file_md5(file_path):
+        digest = hashlib.md5()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def list_remote_blobs(self):
+        """Returns {blob_name: (size, md5)} from a single paginated listing of the container."""
+        remote_blobs = {}
+        for blob in self.container_client.list_blobs(include=['metadata']):
+            metadata = blob.metadata or {}
+            remote_blobs[blob.name] = (blob.size, metadata.get(self.MD5_METADATA_KEY))
+        return remote_blobs
+
+    def sync_folder_to_blob(self, folder_path, workers=1, max_concurrency=4, delete_orphans=False):
+        """Uploads only the files that are new or changed since the last sync.
+
+        A file is unchanged when its size and MD5 match the blob's; the MD5 is only computed
+        for files whose size already matches. With delete_orphans, blobs that no longer exist
+        locally are removed.
+        """
+        remote_blobs = self.list_remote_blobs()
+        local_files = self.list_local_files(folder_path)
+
+        changed_files = []
+        for file_path, blob_name in local_files:
+            remote = remote_blobs.get(blob_name)
+            if remote is None or remote[0] != os.path.getsize(file_path) or remote[1] != self.file_md5(file_path):
+                changed_files.append((file_path, blob_name))
+        print(f"Sync: {len(changed_files)} new or changed, {len(local_files) - len(changed_files)} unchanged")
+
+        report = self.upload_files(changed_files, workers=workers, max_concurrency=max_concurrency)
+        report['skipped'] = len(local_files) - len(changed_files)
+        report['deleted'] = []
+        if delete_orphans:
+            local_names = {blob_name for _, blob_name in local_files}
+            for blob_name in sorted(set(remote_blobs) - local_names):
+                self.container_client.delete_blob(blob_name)
+                report['deleted'].append(blob_name)
+                print(f"Deleted: {blob_name}")
+        return report
 
 
 def main():
@@ -46,9 +178,9 @@ def main():
     # Local folder path to upload
     local_folder_path = "data/"
 
-    # Initialize the AzureBlobUploader and upload the files
+    # Initialize the AzureBlobUploader and upload the files that changed since the last run
     blob_uploader = AzureBlobUploader(connection_string, container_name)
-    blob_uploader.upload_folder_to_blob(local_folder_path)
+    blob_uploader.sync_folder_to_blob(local_folder_path, workers=8)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+#Checks FastSentimentIntensityAnalyzer against NLTK on a golden corpus and measures the per-post speedup
+#Usage: python -m benchmarks.bench_fast_vader --texts 20000 --csv data/redit_data_pull.csv
+
+import argparse
+import random
+import sys
+import time
+
+import pandas as pd
+from nltk.sentiment import SentimentIntensityAnalyzer
+from nltk.sentiment.vader import VaderConstants
+
+from benchmarks.synthetic_corpus import WORDS, make_post
+from fast_vader import FastSentimentIntensityAnalyzer
+from sentiment_analyzer import SentimentAnalyzer
+
+# Words that trigger VADER's special rules, so the corpus exercises every branch
+RULE_WORDS = ['but', 'BUT', 'least', 'at', 'very', 'kind', 'of', 'sort', 'never', 'so', 'this', 'not', "isn't",
+              "don't", 'without', 'the', 'shit', 'bomb', 'bad', 'ass', 'yeah', 'right', 'cut', 'mustard', 'kiss',
+              'death', 'hand', 'to', 'mouth', 'just', 'enough', 'uh-uh', 'nope', 'a', 'I', 'café', 'naïve', '😀']
+DECORATIONS = VaderConstants.PUNC_LIST + ['(', ')', '*', '#', '...', '?!', '’', '"']
+
+
+def golden_texts(count, lexicon, seed=0):
+    """Seeded texts mixing lexicon words, rule words, casing and punctuation in every arrangement."""
+    rng = random.Random(seed)
+    vocabulary = sorted(lexicon)
+    texts = ['', ' ', 'a', '!!!', '???', 'but', 'I am NOT happy!!', "it isn't bad at all", 'the shit', 'kind of good',
+             'least happy', 'at least happy', 'very least happy', 'never so good', 'GREAT but AWFUL :(']
+    for _ in range(count - len(texts)):
+        words = []
+        for _ in range(rng.randint(1, 40)):
+            source = rng.random()
+            if source < 0.4:
+                word = rng.choice(vocabulary)
+            elif source < 0.7:
+                word = rng.choice(RULE_WORDS)
+            else:
+                word = rng.choice(WORDS)
+            casing = rng.random()
+            if casing < 0.1:
+                word = word.upper()
+            elif casing < 0.2:
+                word = word.capitalize()
+            decoration = rng.random()
+            if decoration < 0.1:
+                word = rng.choice(DECORATIONS) + word
+            elif decoration < 0.25:
+                word = word + rng.choice(DECORATIONS)
+            elif decoration < 0.28:
+                word = rng.choice(DECORATIONS) + word + rng.choice(DECORATIONS)
+            words.append(word)
+        separator = rng.choice([' ', ' ', ' ', '  ', '\n', '\t'])
+        texts.append(separator.join(words) + rng.choice(['', '', '.', '!', '!!!!!', '?', '??', '????']))
+    return texts
+
+
+def csv_texts(file_paths):
+    texts = []
+    for file_path in file_paths:
+        df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        texts.extend(SentimentAnalyzer.texts_to_score(df))
+    return texts
+
+
+def time_scorer(scorer, texts):
+    start = time.perf_counter()
+    results = [scorer.polarity_scores(text) for text in texts]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the fast VADER scorer against NLTK and time both")
+    parser.add_argument('--texts', type=int, default=20000, help="Size of the generated golden corpus")
+    parser.add_argument('--posts', type=int, default=5000, help="Synthetic Reddit posts added to the corpus")
+    parser.add_argument('--csv', nargs='*', default=[], help="Scraped CSV files whose posts are checked as well")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    nltk_sia = SentimentIntensityAnalyzer()
+    fast_sia = FastSentimentIntensityAnalyzer()
+
+    rng = random.Random(args.seed)
+    posts = []
+    for _ in range(args.posts):
+        title, _, _, selftext = make_post(rng, None)
+        posts.append(title + selftext)
+    texts = golden_texts(args.texts, nltk_sia.lexicon, args.seed) + posts + csv_texts(args.csv)
+
+    expected, nltk_seconds = time_scorer(nltk_sia, texts)
+    actual, fast_seconds = time_scorer(fast_sia, texts)
+
+    mismatches = [(text, want, got) for text, want, got in zip(texts, expected, actual) if want != got]
+    for text, want, got in mismatches[:10]:
+        print(f"MISMATCH {text!r}\n  nltk {want}\n  fast {got}")
+    print(f"{len(texts)} texts, {len(mismatches)} mismatches")
+    print(f"nltk {nltk_seconds / len(texts) * 1e6:8.1f} us/post")
+    print(f"fast {fast_seconds / len(texts) * 1e6:8.1f} us/post  ({nltk_seconds / fast_seconds:.2f}x)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
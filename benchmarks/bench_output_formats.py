@@ -0,0 +1,62 @@
+#Compares the CSV, JSON and Parquet outputs of the sentiment pipeline: file size and load time
+#Usage: python -m benchmarks.bench_output_formats --rows 200000
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_corpus import generate_corpus, with_fake_scores
+from sentiment_analyzer import CSVSink, JSONSink, ParquetSink
+
+
+def scored_chunks(corpus_path, chunk_size):
+    """Yields the corpus as DataFrames shaped like the pipeline output, with random (VADER-rounded) scores."""
+    chunks = pd.read_csv(corpus_path, chunksize=chunk_size, dtype=str, keep_default_na=False, encoding='utf-8')
+    for index, chunk in enumerate(chunks):
+        yield with_fake_scores(chunk, seed=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output size and reload time per format")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        corpus_path = os.path.join(folder_path, 'corpus.csv')
+        generate_corpus(corpus_path, args.rows)
+        paths = {
+            'csv': os.path.join(folder_path, 'scored.csv'),
+            'json': os.path.join(folder_path, 'scored.json'),
+            'parquet': os.path.join(folder_path, 'scored.parquet'),
+        }
+        sinks = {'csv': CSVSink(paths['csv']), 'json': JSONSink(paths['json']), 'parquet': ParquetSink(paths['parquet'])}
+        write_seconds = dict.fromkeys(sinks, 0.0)
+        for chunk in scored_chunks(corpus_path, args.chunk_size):
+            for name, sink in sinks.items():
+                start = time.perf_counter()
+                sink.write(chunk)
+                write_seconds[name] += time.perf_counter() - start
+        for sink in sinks.values():
+            sink.close()
+
+        loaders = {
+            'csv': lambda: pd.read_csv(paths['csv']),
+            'json': lambda: pd.DataFrame(json.load(open(paths['json'], encoding='utf-8'))),
+            'parquet': lambda: pd.read_parquet(paths['parquet']),
+        }
+        print(f"{'format':<8} {'size MB':>9} {'write s':>8} {'load s':>8}")
+        for name, load in loaders.items():
+            start = time.perf_counter()
+            load()
+            load_seconds = time.perf_counter() - start
+            size_mb = os.path.getsize(paths[name]) / (1024 * 1024)
+            print(f"{name:<8} {size_mb:>9.2f} {write_seconds[name]:>8.2f} {load_seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
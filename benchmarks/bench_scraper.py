@@ -0,0 +1,114 @@
+#Offline crawl benchmark: runs the scraper over the production subreddit list against a local fake Reddit
+#Usage: python -m benchmarks.bench_scraper --latency 0.05 --fetch-mode threads --max-in-flight 8
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+import data_collection_reddit_scrapper as scraper_module
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import JobHuntingPostScraper, RateLimiter, RedditAPI, get_unique_subreddits
+
+
+def production_subreddits():
+    """The subreddit_names list from the scraper's __main__ block, read from its source so it stays in step."""
+    with open(scraper_module.__file__, 'r', encoding='utf-8') as file:
+        tree = ast.parse(file.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(getattr(target, 'id', None) == 'subreddit_names'
+                                                for target in node.targets):
+            return get_unique_subreddits(ast.literal_eval(node.value))
+    raise LookupError("subreddit_names not found in the scraper")
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl throughput against a local fake Reddit API")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument('--latency-jitter', type=float, default=0.02)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--pages-per-listing', type=int, default=10)
+    parser.add_argument('--max-pages', type=int, default=1, help="Pages the scraper follows per subreddit")
+    parser.add_argument('--rate-limit', type=int, default=None, help="Requests per window before 429s")
+    parser.add_argument('--rate-limit-window', type=int, default=600)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fetch-mode', choices=JobHuntingPostScraper.FETCH_MODES, default='threads')
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--subreddits', type=int, default=None, help="Crawl only the first N subreddits")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Also report the Python heap peak with tracemalloc (slows the crawl down)")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    subreddits = production_subreddits()[:args.subreddits]
+    fake = FakeRedditServer(latency=args.latency, latency_jitter=args.latency_jitter, page_size=args.page_size,
+                            pages_per_listing=args.pages_per_listing, rate_limit=args.rate_limit,
+                            rate_limit_window=args.rate_limit_window, error_rate=args.error_rate)
+
+    with fake, tempfile.TemporaryDirectory() as folder_path:
+        # The limiter's window must match the server's, as it would be set for Reddit's
+        rate_limiter = RateLimiter(args.rate_limit or 1000000, period=args.rate_limit_window)
+        api = RedditAPI('client-id', 'client-secret', 'bench/0.0.1', base_url=fake.base_url, auth_url=fake.auth_url,
+                        rate_limiter=rate_limiter, backoff_factor=0.05)
+        scraper = JobHuntingPostScraper(None, None, None, os.path.join(folder_path, 'crawl.csv'), subreddits,
+                                        fetch_mode=args.fetch_mode, max_in_flight=args.max_in_flight, api=api,
+                                        max_pages=args.max_pages)
+        if args.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        # Per-subreddit error messages would drown the report when errors are injected
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.fetch_and_store_posts()
+        wall_seconds = time.perf_counter() - start
+        heap_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if args.trace_memory else None
+        tracemalloc.stop()
+
+        metrics = scraper.metrics.summary()
+        report = {
+            'settings': vars(args),
+            'subreddits': len(subreddits),
+            'wall_seconds': wall_seconds,
+            'posts_written': metrics['posts_written'],
+            'posts_per_sec': metrics['posts_written'] / wall_seconds if wall_seconds else 0.0,
+            'requests': metrics['requests'],
+            'retries': metrics['retries'],
+            'rate_limited_429': metrics['rate_limited_429'],
+            'peak_rss_mb': peak_rss_mb(),
+            'heap_peak_mb': heap_peak_mb,
+            'connections': api.connection_stats(),
+            'server': dict(fake.stats),
+            'endpoints': metrics['endpoints'],
+        }
+        # Closing the session drops the connection pools and their counters, so it comes after the report
+        api.close()
+
+    print(f"{report['subreddits']} subreddits, {report['posts_written']} posts in {wall_seconds:.2f}s: "
+          f"{report['posts_per_sec']:.0f} posts/sec, {report['requests']} requests, {report['retries']} retries, "
+          f"peak RSS {report['peak_rss_mb'] or 0:.0f} MB")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
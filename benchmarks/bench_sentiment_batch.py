@@ -0,0 +1,58 @@
+#Benchmark for the batched SentimentAnalyzer scoring path
+#Usage: python -m benchmarks.bench_sentiment_batch --rows 1000000
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_corpus import generate_corpus
+from sentiment_analyzer import SentimentAnalyzer
+
+
+def analyze_row_by_row(analyzer):
+    """The original analyze_and_update_csv loop, kept here as the baseline."""
+    with open(analyzer.input_file_path, mode='r', newline='', encoding='utf-8') as file, \
+            open(analyzer.updated_file_path, mode='w', newline='', encoding='utf-8') as updated_file:
+        reader = csv.DictReader(file)
+        fieldnames = reader.fieldnames + ['neg_sentiment', 'neu_sentiment', 'pos_sentiment', 'compound_sentiment',
+                                          'overall_sentiment']
+        writer = csv.DictWriter(updated_file, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in reader:
+            sentiment_score = analyzer.sia.polarity_scores(row['title'] + row.get('selftext', ''))
+            row['neg_sentiment'] = sentiment_score['neg']
+            row['neu_sentiment'] = sentiment_score['neu']
+            row['pos_sentiment'] = sentiment_score['pos']
+            row['compound_sentiment'] = sentiment_score['compound']
+            row['overall_sentiment'] = analyzer.categorize_sentiment(sentiment_score['compound'])
+            writer.writerow(row)
+
+
+def time_run(label, rows, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.2f}s  {rows / elapsed:10.0f} rows/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-by-row vs batched sentiment scoring")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        input_path = os.path.join(folder_path, 'synthetic.csv')
+        generate_corpus(input_path, args.rows)
+        analyzer = SentimentAnalyzer(input_path, folder_path)
+
+        before = time_run('row-by-row', args.rows, lambda: analyze_row_by_row(analyzer))
+        after = time_run('batched', args.rows, lambda: analyzer.analyze_and_update_csv(chunk_size=args.chunk_size))
+        print(f"speedup      {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#Scaling benchmark for the process-pool sentiment scoring path
+#Usage: python -m benchmarks.bench_sentiment_workers --rows 200000 --workers 1 2 4 8
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_corpus import generate_corpus
+from sentiment_analyzer import SentimentAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment scoring throughput by number of worker processes")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        input_path = os.path.join(folder_path, 'synthetic.csv')
+        generate_corpus(input_path, args.rows)
+        analyzer = SentimentAnalyzer(input_path, folder_path)
+
+        # The single-process run is always measured first and is the baseline for speedup
+        baseline = None
+        print(f"{'workers':>7} {'seconds':>9} {'rows/sec':>10} {'speedup':>8} {'efficiency':>10}")
+        for workers in sorted(set([1] + args.workers)):
+            start = time.perf_counter()
+            analyzer.analyze_and_update_csv(chunk_size=args.chunk_size, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"{workers:>7} {elapsed:>9.2f} {args.rows / elapsed:>10.0f} {speedup:>7.2f}x {speedup / workers:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#Start-up cost of the entry points: module imports, lexicon loading and a run with nothing to process
+#Usage: python -m benchmarks.bench_startup --repeat 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet runs in a fresh interpreter and prints how long its own work took
+SNIPPETS = {
+    'import sentiment_analyzer': "import sentiment_analyzer",
+    'import scraper': "import data_collection_reddit_scrapper",
+    'import pandas': "import pandas",
+    'import nltk': "import nltk",
+    'nltk SentimentIntensityAnalyzer()': "from nltk.sentiment import SentimentIntensityAnalyzer; SentimentIntensityAnalyzer()",
+    'fast scorer, lexicon from NLTK': "from fast_vader import FastSentimentIntensityAnalyzer; FastSentimentIntensityAnalyzer()",
+    'fast scorer, pickled lexicon': "from fast_vader import FastSentimentIntensityAnalyzer; "
+                                    "FastSentimentIntensityAnalyzer.from_cache({lexicon_cache!r})",
+    'main() with nothing to process': "import sentiment_analyzer; sentiment_analyzer.main(['--manifest-path', "
+                                      "{manifest!r}, '--lexicon-cache', {lexicon_cache!r}])",
+}
+
+
+def time_snippet(code, cwd):
+    program = f"import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', program], cwd=cwd, check=True, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': REPO_PATH}).stdout
+    wall_seconds = time.perf_counter() - start
+    return float(output.strip().splitlines()[-1]), wall_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and start-up times, each measured in a fresh interpreter")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_path:
+        os.makedirs(os.path.join(work_path, 'data'))
+        paths = {'lexicon_cache': os.path.join(work_path, 'vader_lexicon.pickle'),
+                 'manifest': os.path.join(work_path, 'manifest.json')}
+        # Build the pickled lexicon once, so the timed runs measure the warm path
+        time_snippet(SNIPPETS['fast scorer, pickled lexicon'].format(**paths), work_path)
+
+        print(f"{'scenario':<36} {'in-process ms':>14} {'wall ms':>9}")
+        for name, snippet in SNIPPETS.items():
+            timings = [time_snippet(snippet.format(**paths), work_path) for _ in range(args.repeat)]
+            in_process = statistics.median(timing[0] for timing in timings) * 1000
+            wall = statistics.median(timing[1] for timing in timings) * 1000
+            results[name] = {'in_process_ms': in_process, 'wall_ms': wall}
+            print(f"{name:<36} {in_process:>14.1f} {wall:>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#Checks that RateLimiter keeps the scraper within the server's quota: any 429 from the fake Reddit API fails the run
+#Usage: python -m benchmarks.check_rate_limiter --requests 150
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import RateLimiter, RedditAPI
+
+# (requests per window, window seconds, threads) as seen against Reddit: sequential and concurrent crawls
+SCENARIOS = [(60, 10, 1), (60, 10, 8), (10, 3, 8)]
+
+
+def run_scenario(rate_limit, window, threads, requests, latency):
+    """Sends requests listing requests through one shared limiter; returns the server's stats and the wall time."""
+    with FakeRedditServer(latency=latency, latency_jitter=latency, rate_limit=rate_limit,
+                          rate_limit_window=window) as fake:
+        # The configured quota matches the server's, as it would be set for Reddit's
+        api = RedditAPI('client-id', 'client-secret', 'check/0.0.1', base_url=fake.base_url, auth_url=fake.auth_url,
+                        rate_limiter=RateLimiter(rate_limit, period=window), backoff_factor=0.05)
+        url = f"{fake.base_url}/r/jobs/new"
+
+        def fetch(position):
+            return api.request('GET', url, authorized=True, params={'limit': 1}).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(fetch, range(requests)))
+        wall_seconds = time.perf_counter() - start
+        api.close()
+        return dict(fake.stats), statuses, wall_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert zero 429s from a rate-limited fake Reddit API")
+    parser.add_argument('--requests', type=int, default=150, help="Requests sent per scenario")
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'quota':>12} {'threads':>7} {'requests':>8} {'429s':>5} {'wall s':>7} {'req/s':>6} {'quota req/s':>11}")
+    for rate_limit, window, threads in SCENARIOS:
+        # Small quotas would make the default request count take minutes
+        requests = min(args.requests, rate_limit * 4)
+        stats, statuses, wall_seconds = run_scenario(rate_limit, window, threads, requests, args.latency)
+        rate_limited = stats['rate_limited']
+        failed = failed or rate_limited > 0 or any(status != 200 for status in statuses)
+        print(f"{rate_limit:>5}/{window:>3}s {threads:>10} {requests:>8} {rate_limited:>5} {wall_seconds:>7.1f} "
+              f"{requests / wall_seconds:>6.1f} {rate_limit / window:>11.1f}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
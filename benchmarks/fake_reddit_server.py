@@ -0,0 +1,229 @@
+#Local stand-in for the Reddit API endpoints used by the scraper, for offline benchmarks and tests
+#Usage: python -m benchmarks.fake_reddit_server --port 8080 --latency 0.05 --error-rate 0.01
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic_corpus import SUBREDDITS, make_post
+
+
+class FakeRedditServer:
+    """Serves /api/v1/access_token, /r/{subreddit}/{sort} and /search on a local port.
+
+    Every listing holds pages_per_listing pages of deterministic synthetic posts, paged with the
+    'limit' and 'after' parameters like Reddit (at most page_size posts per page). Responses carry
+    X-Ratelimit-* headers; with rate_limit set, requests beyond it in a window get a 429. A
+    fraction error_rate of listing requests fails with error_status, and latency (plus up to
+    latency_jitter) seconds are added to every request.
+    """
+
+    CREATED_UTC = 1700000000
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, latency_jitter=0.0, page_size=100,
+                 pages_per_listing=10, rate_limit=None, rate_limit_window=600, error_rate=0.0, error_status=500,
+                 token_expires_in=3600, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.page_size = page_size
+        self.pages_per_listing = pages_per_listing
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_expires_in = token_expires_in
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.tokens = set()
+        self.window_started = time.monotonic()
+        self.window_used = 0
+        self.stats = {'requests': 0, 'tokens_issued': 0, 'rate_limited': 0, 'errors_injected': 0, 'unauthorized': 0}
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.server.server_port}"
+
+    @property
+    def auth_url(self):
+        return f"{self.base_url}/api/v1/access_token"
+
+    def start(self):
+        fake = self
+
+        class FakeRedditHandler(BaseHTTPRequestHandler):
+            # Keep-alive, so the scraper's connection pool behaves as it does against Reddit
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                fake.respond(self, 'POST', self.path)
+
+            def do_GET(self):
+                fake.respond(self, 'GET', self.path)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), FakeRedditHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='fake-reddit', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, handler, method, path):
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency + self.rng.uniform(0, self.latency_jitter)
+            inject_error = self.rng.random() < self.error_rate
+        time.sleep(delay)
+
+        url = urlsplit(path)
+        if method == 'POST' and url.path == '/api/v1/access_token':
+            return self.send(handler, 200, self.issue_token())
+        if method != 'GET':
+            return self.send(handler, 405, {'message': 'Method Not Allowed'})
+
+        token = handler.headers.get('Authorization', '').partition(' ')[2]
+        if token not in self.tokens:
+            with self.lock:
+                self.stats['unauthorized'] += 1
+            return self.send(handler, 401, {'message': 'Unauthorized', 'error': 401})
+
+        rate_headers, limited = self.take_quota()
+        if limited:
+            return self.send(handler, 429, {'message': 'Too Many Requests', 'error': 429}, rate_headers)
+        if inject_error:
+            with self.lock:
+                self.stats['errors_injected'] += 1
+            return self.send(handler, self.error_status, {'message': 'Injected error', 'error': self.error_status},
+                             rate_headers)
+
+        query = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'r':
+            listing_key = f"{parts[1]}/{parts[2]}"
+            subreddit = parts[1]
+        elif parts == ['search']:
+            listing_key = f"search/{query.get('q', [''])[0]}"
+            subreddit = None
+        else:
+            return self.send(handler, 404, {'message': 'Not Found', 'error': 404}, rate_headers)
+        return self.send(handler, 200, self.listing(listing_key, subreddit, query), rate_headers)
+
+    def issue_token(self):
+        with self.lock:
+            self.stats['tokens_issued'] += 1
+            token = f"fake-token-{self.stats['tokens_issued']}"
+            self.tokens.add(token)
+        return {'access_token': token, 'token_type': 'bearer', 'expires_in': self.token_expires_in,
+                'scope': '*'}
+
+    def take_quota(self):
+        """Counts the request against the fixed rate-limit window; returns the headers and whether it is over quota."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_started >= self.rate_limit_window:
+                self.window_started = now
+                self.window_used = 0
+            self.window_used += 1
+            reset = max(0, int(self.window_started + self.rate_limit_window - now))
+            # Without a configured limit the quota is simply never reached
+            capacity = self.rate_limit if self.rate_limit is not None else 1000000
+            limited = self.window_used > capacity
+            if limited:
+                self.stats['rate_limited'] += 1
+            used = min(self.window_used, capacity)
+        headers = {
+            'X-Ratelimit-Used': str(used),
+            'X-Ratelimit-Remaining': str(capacity - used),
+            'X-Ratelimit-Reset': str(reset),
+        }
+        if limited:
+            headers['Retry-After'] = str(reset)
+        return headers, limited
+
+    def listing(self, listing_key, subreddit, query):
+        """Builds one page of a listing; posts are a pure function of (listing, position), so reruns match."""
+        limit = min(int(query.get('limit', ['25'])[0]), self.page_size)
+        after = query.get('after', [None])[0]
+        start = int(after.rpartition('_')[2]) + 1 if after else 0
+        total = self.pages_per_listing * self.page_size
+        end = min(start + limit, total)
+        listing_id = zlib.crc32(listing_key.encode('utf-8'))
+        children = []
+        for position in range(start, end):
+            rng = random.Random((self.seed << 40) ^ (listing_id << 20) ^ position)
+            title, num_comments, _, selftext = make_post(rng, None)
+            post_subreddit = subreddit or rng.choice(SUBREDDITS)
+            children.append({'kind': 't3', 'data': {
+                'title': title,
+                'selftext': selftext,
+                'subreddit': post_subreddit,
+                'num_comments': num_comments,
+                'score': rng.randint(0, 5000),
+                'over_18': rng.random() < 0.02,
+                'id': f"{listing_id:x}_{position}",
+                'name': f"t3_{listing_id:x}_{position}",
+                # Newest first, one post per minute
+                'created_utc': float(self.CREATED_UTC - position * 60),
+            }})
+        next_after = f"t3_{listing_id:x}_{end - 1}" if children and end < total else None
+        return {'kind': 'Listing', 'data': {'after': next_after, 'dist': len(children), 'children': children}}
+
+    @staticmethod
+    def send(handler, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=UTF-8')
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Reddit API until interrupted")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--pages-per-listing', type=int, default=10)
+    parser.add_argument('--rate-limit', type=int, default=None, help="Requests allowed per window (default: unlimited)")
+    parser.add_argument('--rate-limit-window', type=int, default=600)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    args = parser.parse_args()
+
+    server = FakeRedditServer(port=args.port, latency=args.latency, latency_jitter=args.latency_jitter,
+                              page_size=args.page_size, pages_per_listing=args.pages_per_listing,
+                              rate_limit=args.rate_limit, rate_limit_window=args.rate_limit_window,
+                              error_rate=args.error_rate, error_status=args.error_status).start()
+    print(f"Fake Reddit API on {server.base_url} (token endpoint {server.auth_url})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
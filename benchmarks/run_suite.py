@@ -0,0 +1,223 @@
+#Benchmark suite for the sentiment pipeline with machine-readable results for regression checks
+#Usage: python -m benchmarks.run_suite --sizes 10k 100k --output results.json
+#       python -m benchmarks.run_suite --sizes 10k 100k --compare results.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import sentiment_analyzer
+from benchmarks.synthetic_corpus import SIZES, generate_corpus, with_fake_scores
+from near_duplicate_detector import NearDuplicateDetector
+from sentiment_analyzer import CSVSink, DataProcessor, JSONSink, SentimentAnalyzer, StreamingDeduplicator
+from sentiment_rollup import SentimentRollup
+
+DEDUP_COLUMNS = ['title', 'selftext']
+
+
+def read_corpus(context):
+    pd.read_csv(context['corpus_path'], dtype=str, keep_default_na=False)
+
+
+def dedup_pandas(context):
+    DataProcessor(context['df']).remove_duplicates(DEDUP_COLUMNS)
+
+
+def dedup_exact(context):
+    deduplicator = StreamingDeduplicator(DEDUP_COLUMNS, mode='exact')
+    for chunk in context['chunks']:
+        deduplicator.filter(chunk)
+
+
+def dedup_bloom(context):
+    deduplicator = StreamingDeduplicator(DEDUP_COLUMNS, mode='bloom', expected_rows=len(context['df']))
+    for chunk in context['chunks']:
+        deduplicator.filter(chunk)
+
+
+def dedup_near(context):
+    detector = NearDuplicateDetector()
+    for chunk in context['chunks']:
+        detector.filter(chunk)
+
+
+def scoring(context):
+    analyzer = SentimentAnalyzer(context['corpus_path'], context['work_path'])
+    for chunk in context['chunks']:
+        analyzer.score_dataframe(chunk)
+
+
+def write_csv(context):
+    sink = CSVSink(os.path.join(context['work_path'], 'scored.csv'))
+    for chunk in context['scored_chunks']:
+        sink.write(chunk)
+    sink.close()
+
+
+def write_json(context):
+    sink = JSONSink(os.path.join(context['work_path'], 'scored.json'))
+    for chunk in context['scored_chunks']:
+        sink.write(chunk)
+    sink.close()
+
+
+def rollup(context):
+    stats = {}
+    for chunk in context['scored_chunks']:
+        for key, chunk_stats in SentimentRollup.summarize(chunk).items():
+            if key in stats:
+                stats[key].merge(chunk_stats)
+            else:
+                stats[key] = chunk_stats
+
+
+def end_to_end(context):
+    """Runs sentiment_analyzer.main() on a data/ folder holding only the corpus, without cache or manifest reuse."""
+    run_path = tempfile.mkdtemp(dir=context['work_path'])
+    os.makedirs(os.path.join(run_path, 'data'))
+    os.link(context['corpus_path'], os.path.join(run_path, 'data', 'corpus.csv'))
+    previous_path = os.getcwd()
+    os.chdir(run_path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sentiment_analyzer.main(['--no-cache', '--manifest-path', os.path.join(run_path, 'manifest.json'),
+                                     '--rollup-path', os.path.join(run_path, 'rollup.sqlite')])
+    finally:
+        os.chdir(previous_path)
+
+
+SCENARIOS = {
+    'read_csv': read_corpus,
+    'dedup_pandas': dedup_pandas,
+    'dedup_exact': dedup_exact,
+    'dedup_bloom': dedup_bloom,
+    'dedup_near': dedup_near,
+    'scoring': scoring,
+    'write_csv': write_csv,
+    'write_json': write_json,
+    'rollup': rollup,
+    'end_to_end': end_to_end,
+}
+
+
+def split_chunks(df, chunk_size):
+    return [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def run_suite(sizes, scenarios, repeat=3, chunk_size=10000, seed=0):
+    """Times every scenario on a corpus of every size and returns the result records.
+
+    Corpus generation and loading are not timed. Each scenario runs repeat times; the best
+    run is the headline number and the median shows the noise.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_path:
+        for size in sizes:
+            rows = SIZES[size]
+            corpus_path = os.path.join(work_path, f'corpus_{size}.csv')
+            generate_corpus(corpus_path, rows, seed=seed)
+            df = pd.read_csv(corpus_path, dtype=str, keep_default_na=False)
+            scored = with_fake_scores(df, seed)
+            context = {
+                'corpus_path': corpus_path,
+                'work_path': work_path,
+                'df': df,
+                'chunks': split_chunks(df, chunk_size),
+                'scored_chunks': split_chunks(scored, chunk_size),
+            }
+            for name in scenarios:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    SCENARIOS[name](context)
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                results.append({
+                    'scenario': name,
+                    'size': size,
+                    'rows': rows,
+                    'best_seconds': best,
+                    'median_seconds': statistics.median(timings),
+                    'rows_per_sec': rows / best if best else 0.0,
+                    'repeat': repeat,
+                })
+                print(f"{name:<14} {size:>5} {best:>9.3f}s {rows / best if best else 0.0:>12.0f} rows/sec",
+                      file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints each scenario's time relative to the baseline and returns the regressions."""
+    baseline_times = {(record['scenario'], record['size']): record['best_seconds'] for record in baseline['results']}
+    regressions = []
+    print(f"{'scenario':<14} {'size':>5} {'baseline':>9} {'current':>9} {'ratio':>7}")
+    for record in results:
+        before = baseline_times.get((record['scenario'], record['size']))
+        if before is None:
+            continue
+        ratio = record['best_seconds'] / before
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(record)
+        print(f"{record['scenario']:<14} {record['size']:>5} {before:>9.3f} {record['best_seconds']:>9.3f} "
+              f"{ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time dedup, scoring, output writing and main() on synthetic corpora")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['10k', '100k'])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', help="Earlier results file to compare against; exits 1 on a regression")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Slowdown relative to the baseline that counts as a regression (default: 10%%)")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.scenarios, args.repeat, args.chunk_size, args.seed)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'chunk_size': args.chunk_size, 'seed': args.seed},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#Synthetic Reddit corpus with the scraper's CSV schema, for reproducible benchmarks
+#Usage: python -m benchmarks.synthetic_corpus --rows 100000 data/synthetic.csv
+
+import argparse
+import csv
+import random
+
+import numpy as np
+
+from sentiment_analyzer import SentimentAnalyzer
+
+WORDS = ['job', 'interview', 'offer', 'rejected', 'ghosted', 'happy', 'great', 'terrible', 'anxious', 'hope',
+         'resume', 'manager', 'salary', 'love', 'hate', 'tired', 'excited', 'not', 'very', 'really', 'the', 'a',
+         'I', 'my', 'again', 'never', 'finally', 'awful', 'good', 'bad', 'company', 'team', 'week', 'today']
+
+# Ordered by size: generate_corpus gives them Zipf-like weights
+SUBREDDITS = ['jobs', 'careerguidance', 'recruitinghell', 'antiwork', 'depression', 'Advice', 'resumes', 'work']
+
+# Row counts of the standard benchmark sizes
+SIZES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+
+# Posts kept around as repost candidates; bounds memory for the 1m corpus
+RECENT_POSTS = 10000
+
+# Posts are spread over the 30 days before this time (epoch seconds, UTC)
+LATEST_CREATED_UTC = 1700000000
+CREATED_UTC_SPAN = 30 * 86400
+
+
+def word_count(rng, median, sigma, maximum):
+    """Draws a lognormal word count: most posts are short, a few are very long."""
+    return max(1, min(maximum, int(rng.lognormvariate(0, sigma) * median)))
+
+
+def make_post(rng, subreddit_weights):
+    title = ' '.join(rng.choices(WORDS, k=word_count(rng, 9, 0.5, 60)))
+    # About a third of posts are link or image posts without a body
+    if rng.random() < 0.3:
+        selftext = ''
+    else:
+        selftext = ' '.join(rng.choices(WORDS, k=word_count(rng, 60, 1.0, 2000)))
+    num_comments = int(rng.paretovariate(1.2)) - 1
+    subreddit = rng.choices(SUBREDDITS, weights=subreddit_weights)[0]
+    return [title, num_comments, subreddit, selftext]
+
+
+def near_duplicate(rng, post):
+    """A repost with one word of the body changed, as happens with edited cross-posts."""
+    title, num_comments, subreddit, selftext = post
+    words = selftext.split()
+    if len(words) < 10:
+        return [title + ' again', num_comments, subreddit, selftext]
+    words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return [title, num_comments, subreddit, ' '.join(words)]
+
+
+def generate_corpus(file_path, rows, duplicate_rate=0.05, near_duplicate_rate=0.02, seed=0):
+    """Writes rows posts with the scraper's columns to file_path.
+
+    duplicate_rate of the rows repeat an earlier post exactly (the same post returned by two
+    listings or crawls) and near_duplicate_rate are slightly edited reposts. Subreddit sizes
+    follow a Zipf-like distribution, and creation times are spread over CREATED_UTC_SPAN. The
+    same seed always produces the same file.
+    """
+    rng = random.Random(seed)
+    subreddit_weights = [1.0 / rank for rank in range(1, len(SUBREDDITS) + 1)]
+    recent = []
+    with open(file_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['title', 'num_comments', 'subreddit', 'selftext', 'created_utc'])
+        for _ in range(rows):
+            draw = rng.random()
+            if recent and draw < duplicate_rate:
+                post = rng.choice(recent)
+            elif recent and draw < duplicate_rate + near_duplicate_rate:
+                post = near_duplicate(rng, rng.choice(recent))
+            else:
+                post = make_post(rng, subreddit_weights)
+                if len(recent) < RECENT_POSTS:
+                    recent.append(post)
+                else:
+                    recent[rng.randrange(RECENT_POSTS)] = post
+            created_utc = LATEST_CREATED_UTC - rng.randrange(CREATED_UTC_SPAN)
+            writer.writerow(post + [created_utc])
+
+
+def with_fake_scores(df, seed=0):
+    """Adds sentiment columns with plausible (VADER-rounded) values, so output benchmarks do not pay for scoring."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    scores = rng.dirichlet([1, 3, 1], size=len(df)).round(3)
+    df['neg_sentiment'] = scores[:, 0]
+    df['neu_sentiment'] = scores[:, 1]
+    df['pos_sentiment'] = scores[:, 2]
+    df['compound_sentiment'] = rng.uniform(-1, 1, len(df)).round(4)
+    df['overall_sentiment'] = SentimentAnalyzer.categorize_sentiments(df['compound_sentiment'])
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Reddit CSV with the scraper's schema")
+    parser.add_argument('file_path')
+    parser.add_argument('--rows', type=int, default=SIZES['100k'])
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--near-duplicate-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.file_path, args.rows, args.duplicate_rate, args.near_duplicate_rate, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#Done By Dacorie Smith
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed buckets, so percentiles take constant memory however many requests are seen."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, upper_bound in enumerate(self.BUCKETS):
+            if seconds <= upper_bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Estimates the q-th quantile (0-1) by interpolating inside the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        lower_bound = 0.0
+        for upper_bound, bucket_count in zip(self.BUCKETS, self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                upper_bound = min(upper_bound, self.max)
+                return lower_bound + (upper_bound - lower_bound) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower_bound = upper_bound
+        return self.max
+
+
+class CrawlMetrics:
+    """Thread-safe crawl telemetry: requests, bytes, latency per endpoint, retries, 429s, posts and queue depth.
+
+    Exported as a JSON summary or in the Prometheus text format (to a file or a local HTTP port).
+    """
+
+    SLOWEST_ITEMS = 10
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.requests = {}
+        self.response_bytes = {}
+        self.latency = {}
+        self.status_codes = {}
+        self.retries = {}
+        self.rate_limited = 0
+        self.posts_written = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.item_seconds = {}
+
+    def record_request(self, endpoint, seconds, status_code, response_bytes):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.response_bytes[endpoint] = self.response_bytes.get(endpoint, 0) + response_bytes
+            self.latency.setdefault(endpoint, LatencyHistogram()).observe(seconds)
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+            if status_code == 429:
+                self.rate_limited += 1
+
+    def record_retry(self, endpoint):
+        with self.lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_posts_written(self, count):
+        with self.lock:
+            self.posts_written += count
+
+    def observe_queue_depth(self, depth):
+        with self.lock:
+            self.queue_depth = depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_item(self, item, seconds):
+        """Time spent fetching one subreddit/keyword, to spot the slow ones."""
+        with self.lock:
+            self.item_seconds[item] = seconds
+
+    def summary(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started_at
+            endpoints = {}
+            for endpoint, histogram in self.latency.items():
+                endpoints[endpoint] = {
+                    'requests': self.requests[endpoint],
+                    'bytes': self.response_bytes[endpoint],
+                    'retries': self.retries.get(endpoint, 0),
+                    'latency_p50': histogram.percentile(0.50),
+                    'latency_p95': histogram.percentile(0.95),
+                    'latency_p99': histogram.percentile(0.99),
+                    'latency_max': histogram.max,
+                }
+            slowest = sorted(self.item_seconds.items(), key=lambda item: item[1], reverse=True)[:self.SLOWEST_ITEMS]
+            return {
+                'elapsed_seconds': elapsed,
+                'requests': sum(self.requests.values()),
+                'bytes': sum(self.response_bytes.values()),
+                'retries': sum(self.retries.values()),
+                'rate_limited_429': self.rate_limited,
+                'status_codes': {str(code): count for code, count in sorted(self.status_codes.items())},
+                'posts_written': self.posts_written,
+                'posts_per_second': self.posts_written / elapsed if elapsed else 0.0,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'endpoints': endpoints,
+                'slowest_items': [{'item': item, 'seconds': seconds} for item, seconds in slowest],
+            }
+
+    def write_json(self, file_path, extra=None):
+        summary = self.summary()
+        summary.update(extra or {})
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=4)
+
+    def prometheus_text(self):
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self.lock:
+            elapsed = time.monotonic() - self.started_at
+            metric('reddit_requests_total', 'counter', 'HTTP requests sent, by endpoint.',
+                   [({'endpoint': endpoint}, count) for endpoint, count in self.requests.items()])
+            metric('reddit_response_bytes_total', 'counter', 'Response body bytes received, by endpoint.',
+                   [({'endpoint': endpoint}, count) for endpoint, count in self.response_bytes.items()])
+            metric('reddit_retries_total', 'counter', 'Requests retried after a 429/5xx or connection error.',
+                   [({'endpoint': endpoint}, count) for endpoint, count in self.retries.items()])
+            metric('reddit_rate_limited_total', 'counter', 'Responses with status 429.', [({}, self.rate_limited)])
+            metric('reddit_request_duration_seconds', 'histogram', 'Request latency in seconds.', [])
+            for endpoint, histogram in self.latency.items():
+                cumulative = 0
+                for upper_bound, bucket_count in zip(histogram.BUCKETS, histogram.counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if upper_bound == float('inf') else repr(upper_bound)
+                    lines.append(f'reddit_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}')
+                lines.append(f'reddit_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+                lines.append(f'reddit_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+            metric('crawl_posts_written_total', 'counter', 'Posts written to the CSV output.',
+                   [({}, self.posts_written)])
+            metric('crawl_posts_per_second', 'gauge', 'Posts written per second since the crawl started.',
+                   [({}, self.posts_written / elapsed if elapsed else 0.0)])
+            metric('crawl_writer_queue_depth', 'gauge', 'Batches waiting in the writer queue.',
+                   [({}, self.queue_depth)])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus_text())
+
+    def serve_prometheus(self, port, host='127.0.0.1'):
+        """Serves the Prometheus text format on http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+        return server
@@ -1,78 +1,608 @@
 #Done By Dacorie Smith
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import csv
+import gzip
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 import os
-from nltk.sentiment import SentimentIntensityAnalyzer
+import queue
+import random
+import sqlite3
+import threading
+import time
 import json
+import math
 from datetime import datetime
+from urllib.parse import urlsplit
+
+from crawl_metrics import CrawlMetrics
+from persistence import atomic_write, query_in_batches
+
+
+class RateLimiter:
+    """Token bucket fed by Reddit's X-Ratelimit-* headers; one instance can be shared by many threads.
+
+    The server's window is only known from its responses, so the bucket errs on the safe side:
+    requests still in flight are subtracted from every Remaining it reports, the whole-second Reset
+    is rounded up plus reset_margin, and once the estimated reset passes a single probe request is
+    sent and the quota is only refilled from the probe's response, when the server has confirmed
+    the new window.
+    """
+
+    def __init__(self, requests_per_period=60, period=60, clock=time.monotonic, sleep=time.sleep, reset_margin=1.0,
+                 probe_poll_interval=0.01):
+        self.capacity = requests_per_period
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+        self.reset_margin = reset_margin
+        self.probe_poll_interval = probe_poll_interval
+        self.lock = threading.Lock()
+        self.remaining = requests_per_period
+        self.reset_at = clock() + period
+        self.next_slot = 0.0
+        self.in_flight = 0
+        # Incremented for every window; responses to requests sent in an earlier window are stale
+        self.window = 0
+        self.probing = False
+        # Until the server reports its quota the bucket starts full and may burst
+        self.synced = False
+
+    def acquire(self):
+        """Blocks until the next request may be sent, spreading the remaining quota evenly over the window.
+
+        Returns the window the request counts against; pass it to update() or release().
+        """
+        while True:
+            with self.lock:
+                now = self.clock()
+                delay = self.reserve(now)
+                if delay is None:
+                    slot = max(now, self.next_slot)
+                    self.remaining -= 1
+                    self.in_flight += 1
+                    if not self.synced or self.probing:
+                        self.next_slot = slot
+                    elif self.remaining > 0:
+                        self.next_slot = slot + (self.reset_at - slot) / self.remaining
+                    else:
+                        self.next_slot = self.reset_at
+                    window = self.window
+                    break
+            self.sleep(delay)
+        if slot > now:
+            self.sleep(slot - now)
+        return window
+
+    def reserve(self, now):
+        """Rolls the window over where due; returns None if a request may take a slot, else how long to wait."""
+        if not self.synced:
+            # Nothing is known about the server's window yet: assume the configured quota
+            if now >= self.reset_at:
+                self.remaining = self.capacity
+                self.reset_at = now + self.period
+            if self.remaining <= 0:
+                return self.reset_at - now
+            return None
+        if self.probing:
+            # The probe for the new window is outstanding; wait for its response
+            return None if self.remaining > 0 else self.probe_poll_interval
+        if now >= self.reset_at:
+            self.window += 1
+            self.probing = True
+            self.remaining = 1
+            self.next_slot = now
+            return None
+        if self.remaining <= 0:
+            return self.reset_at - now
+        return None
+
+    def release(self, window=None):
+        """Ends a request that got no response (e.g. a connection error).
+
+        It stops counting as in flight. Its slot is not given back, as the server may still have
+        counted it, unless it was the probe of a new window, in which case another request may probe.
+        """
+        self.update({}, window)
+
+    def update(self, headers, window=None):
+        """Re-syncs the bucket with the quota reported on a response to a request sent in window."""
+        report = self.parse_headers(headers)
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if window is not None and window != self.window:
+                # Counted in a window that has since rolled over; says nothing about the current one
+                return
+            if report is None:
+                if self.probing:
+                    # Let another request probe the new window
+                    self.remaining = max(self.remaining, 1)
+                return
+            remaining, reset_at, capacity = report
+            if capacity:
+                self.capacity = capacity
+            # Requests still in flight may not be counted by the server yet
+            available = max(0, remaining - self.in_flight)
+            if not self.synced or self.probing:
+                # First report, or the probe's response confirming the new window
+                self.remaining = available
+                self.reset_at = reset_at
+                self.probing = False
+                self.synced = True
+            else:
+                # Every report of the current window is at or after its true reset; the earliest is closest
+                self.remaining = min(self.remaining, available)
+                self.reset_at = min(self.reset_at, reset_at)
+
+    def parse_headers(self, headers):
+        """Returns (remaining, reset_at, capacity) from X-Ratelimit-* headers, or None if they are missing."""
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-Ratelimit-Reset')
+        if remaining is None or reset is None:
+            return None
+        try:
+            remaining = int(float(remaining))
+            # Reset is rounded down to whole seconds, so the true reset is less than a second later
+            reset_at = self.clock() + math.floor(float(reset)) + 1 + self.reset_margin
+            used = headers.get('X-Ratelimit-Used')
+            capacity = remaining + int(float(used)) if used is not None else None
+        except ValueError:
+            return None
+        return remaining, reset_at, capacity
 
 
 class RedditAPI:
-    def __init__(self, client_id, client_secret, user_agent):
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, client_id, client_secret, user_agent, base_url='https://oauth.reddit.com',
+                 auth_url='https://www.reddit.com/api/v1/access_token', pool_size=16, compression=True,
+                 rate_limiter=None, max_retries=3, backoff_factor=1.0, token_cache_path=None,
+                 token_refresh_margin=300, metrics=None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.user_agent = user_agent
-        self.base_url = 'https://oauth.reddit.com'
-        self.auth_url = 'https://www.reddit.com/api/v1/access_token'
+        # Both URLs can be pointed at a local stub server for offline testing
+        self.base_url = base_url
+        self.auth_url = auth_url
         self.headers = {'User-Agent': self.user_agent}
-        self.access_token = self.authenticate()
+        # requests asks for gzip/deflate by default; 'identity' turns compression off
+        if not compression:
+            self.headers['Accept-Encoding'] = 'identity'
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session = self.create_session(self.adapter)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.metrics = metrics or CrawlMetrics()
+        # The token is refreshed token_refresh_margin seconds before it expires, and optionally
+        # cached on disk so short runs can skip the auth round-trip
+        self.token_lock = threading.Lock()
+        self.token_cache_path = token_cache_path
+        self.token_refresh_margin = token_refresh_margin
+        self.access_token = None
+        self.token_expires_at = 0.0
+        if not self.load_cached_token():
+            self.authenticate()
+
+    @staticmethod
+    def create_session(adapter):
+        """Creates a keep-alive session whose connection pool is shared by every request."""
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def connection_stats(self):
+        """Returns the number of requests sent and how many connections were opened versus reused."""
+        pools = self.adapter.poolmanager.pools
+        requests_sent = 0
+        connections_opened = 0
+        for key in pools.keys():
+            pool = pools[key]
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+        return {
+            'requests': requests_sent,
+            'connections_opened': connections_opened,
+            'connections_reused': max(0, requests_sent - connections_opened),
+        }
+
+    def close(self):
+        self.session.close()
+
+    def request(self, method, url, rate_limited=True, authorized=False, **kwargs):
+        """Sends a request through the rate limiter, retrying with backoff on 429/5xx and connection errors.
+
+        Authorized requests carry a bearer token that is refreshed before it expires, and once more
+        if the server rejects it with a 401.
+        """
+        token_refreshed = False
+        endpoint = self.endpoint_name(url)
+        for attempt in range(self.max_retries + 1):
+            if authorized:
+                token = self.ensure_token()
+                kwargs['headers'] = {**self.headers, 'Authorization': f'bearer {token}'}
+            try:
+                response, window, seconds = self.send(method, url, rate_limited, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.record_retry(endpoint)
+                time.sleep(self.backoff_delay(attempt))
+                continue
+            self.metrics.record_request(endpoint, seconds, response.status_code, len(response.content))
+            if rate_limited:
+                self.rate_limiter.update(response.headers, window)
+            if authorized and response.status_code == 401 and not token_refreshed and attempt < self.max_retries:
+                self.ensure_token(stale_token=token)
+                token_refreshed = True
+                continue
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            self.metrics.record_retry(endpoint)
+            time.sleep(self.backoff_delay(attempt, response.headers.get('Retry-After')))
+        return response
+
+    def send(self, method, url, rate_limited, **kwargs):
+        """Sends one request in a rate-limiter slot; returns (response, limiter window, seconds taken).
+
+        Whatever the request raises (connection errors, but also e.g. a bad gzip body), the slot is
+        released, so a failed probe never leaves the limiter waiting for a response that will not come.
+        """
+        window = self.rate_limiter.acquire() if rate_limited else None
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs), window, time.perf_counter() - start
+        except BaseException:
+            if rate_limited:
+                self.rate_limiter.release(window)
+            raise
+
+    def endpoint_name(self, url):
+        """Groups URLs for the metrics, e.g. every subreddit's top listing becomes '/r/{subreddit}/top'."""
+        if url == self.auth_url:
+            return 'access_token'
+        parts = urlsplit(url).path.rstrip('/').split('/')
+        if len(parts) >= 3 and parts[1] == 'r':
+            parts[2] = '{subreddit}'
+        return '/'.join(parts) or '/'
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Honors Retry-After when given, otherwise exponential backoff with jitter."""
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_factor * (2 ** attempt) * random.uniform(0.5, 1.5)
 
     def authenticate(self):
         auth = HTTPBasicAuth(self.client_id, self.client_secret)
         data = {'grant_type': 'client_credentials'}
-        response = requests.post(self.auth_url, auth=auth, data=data, headers=self.headers)
+        response = self.request('POST', self.auth_url, rate_limited=False, auth=auth, data=data,
+                                headers={'User-Agent': self.user_agent})
         response.raise_for_status()
-        return response.json()['access_token']
+        payload = response.json()
+        self.access_token = payload['access_token']
+        self.token_expires_at = time.time() + float(payload.get('expires_in', 3600))
+        self.save_cached_token()
+        return self.access_token
+
+    def ensure_token(self, stale_token=None):
+        """Returns a valid access token, re-authenticating when it is about to expire or was rejected.
+
+        Only one thread re-authenticates; the others wait for it and reuse the new token.
+        """
+        with self.token_lock:
+            expiring = time.time() >= self.token_expires_at - self.token_refresh_margin
+            if self.access_token is None or expiring or (stale_token is not None and stale_token == self.access_token):
+                self.authenticate()
+            return self.access_token
+
+    def load_cached_token(self):
+        """Reuses a token cached by an earlier run if it belongs to this client and is not about to expire."""
+        if not self.token_cache_path or not os.path.exists(self.token_cache_path):
+            return False
+        try:
+            with open(self.token_cache_path, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if cached.get('client_id') != self.client_id or \
+                time.time() >= cached.get('expires_at', 0) - self.token_refresh_margin:
+            return False
+        self.access_token = cached['access_token']
+        self.token_expires_at = cached['expires_at']
+        return True
+
+    def save_cached_token(self):
+        if not self.token_cache_path:
+            return
+        # The token is a credential: create the file readable by its owner only
+        with atomic_write(self.token_cache_path, permissions=0o600) as file:
+            json.dump({'client_id': self.client_id, 'access_token': self.access_token,
+                       'expires_at': self.token_expires_at}, file)
 
     def make_headers(self):
-        self.headers['Authorization'] = f'bearer {self.access_token}'
+        self.headers['Authorization'] = f'bearer {self.ensure_token()}'
+
+    # Reddit never returns more than 100 posts per listing page
+    PAGE_LIMIT = 100
 
     def get_subreddit_posts(self, subreddit):
         url = f'{self.base_url}/r/{subreddit}/top'
-        response = requests.get(url, headers=self.headers)
+        response = self.request('GET', url, authorized=True)
         response.raise_for_status()
         return response.json()
 
     def search_posts(self, keyword):
-        search_url = f"{self.base_url}/search?limit=1000&q={keyword}&sort=new"
-        response = requests.get(search_url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return next(self.iter_search_posts(keyword, max_pages=1))
+
+    def iter_listing(self, url, params=None, max_pages=None, after=None):
+        """Lazily yields listing pages, following the 'after' cursor until it runs out or max_pages is hit.
+
+        Paging starts at the given after cursor, or at the top of the listing.
+        """
+        params = dict(params or {})
+        params.setdefault('limit', self.PAGE_LIMIT)
+        if after:
+            params['after'] = after
+        pages = 0
+        while True:
+            response = self.request('GET', url, params=params, authorized=True)
+            response.raise_for_status()
+            listing = response.json()
+            yield listing
+            pages += 1
+            after = listing.get('data', {}).get('after')
+            if not after or (max_pages is not None and pages >= max_pages):
+                return
+            params['after'] = after
+
+    def iter_subreddit_posts(self, subreddit, sort='top', max_pages=None, after=None):
+        return self.iter_listing(f'{self.base_url}/r/{subreddit}/{sort}', max_pages=max_pages, after=after)
+
+    def iter_search_posts(self, keyword, sort='new', max_pages=None, after=None):
+        return self.iter_listing(f'{self.base_url}/search', params={'q': keyword, 'sort': sort}, max_pages=max_pages,
+                                 after=after)
+
+
+class CrawlCheckpoint:
+    """Persists the newest post seen per subreddit/keyword so later crawls only fetch newer posts.
+
+    A newest-first crawl that runs out of pages before reaching the stored post leaves a gap. It is
+    recorded as a 'resume' entry holding the listing cursor where the crawl stopped and the newest
+    post it saw. The next crawl continues from that cursor, and the newest post becomes the
+    checkpoint only once the gap is closed.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.entries = self.load()
+
+    def load(self):
+        if os.path.exists(self.file_path):
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        return {}
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def reload(self):
+        """Drops every change made since the last save(), e.g. after a crawl whose posts were not all written."""
+        with self.lock:
+            self.entries = self.load()
+
+    def update(self, key, fullname, created_utc):
+        """Records a post for key if it is newer than the one already stored, ending an interrupted crawl."""
+        with self.lock:
+            current = self.entries.get(key)
+            if current is None or created_utc > current['created_utc']:
+                self.entries[key] = {'fullname': fullname, 'created_utc': created_utc}
+            else:
+                current.pop('resume', None)
+
+    def resume_cursor(self, key):
+        """The listing cursor an interrupted crawl of key stopped at, or None."""
+        with self.lock:
+            return self.entries.get(key, {}).get('resume', {}).get('after')
+
+    def suspend(self, key, after, fullname, created_utc):
+        """Records that a crawl of key stopped at the after cursor before reaching the stored post."""
+        with self.lock:
+            current = self.entries[key]
+            resume = current.get('resume')
+            if resume is None or created_utc > resume['created_utc']:
+                current['resume'] = {'after': after, 'fullname': fullname, 'created_utc': created_utc}
+            else:
+                resume['after'] = after
+
+    def save(self):
+        """Writes the checkpoint atomically so an interrupted run never leaves a corrupt file."""
+        with self.lock, atomic_write(self.file_path) as file:
+            json.dump(self.entries, file, indent=4)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton: tells in one pass over a text whether any of the keywords occurs (case-insensitive)."""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.terminal = [False]
+        for keyword in keywords:
+            if keyword:
+                self.add_keyword(keyword.lower())
+        self.build_failure_links()
+
+    def add_keyword(self, keyword):
+        node = 0
+        for char in keyword:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(False)
+                self.goto[node][char] = child
+            node = child
+        self.terminal[node] = True
+
+    def build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # A node also matches if any keyword ending at its failure target does
+                self.terminal[child] = self.terminal[child] or self.terminal[self.fail[child]]
+
+    def search(self, text):
+        goto, fail, terminal = self.goto, self.fail, self.terminal
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if terminal[node]:
+                return True
+        return False
 
 
 class PostFilter:
-    @staticmethod
-    def filter_posts(posts, min_length=10):
+    """Turns a listing page into CSV rows, keeping the posts that pass every configured rule.
+
+    Cheap field checks run first, then keyword matching, and language detection last. Language
+    detection needs the optional langdetect package. max_posts_per_page stops after examining that
+    many posts of a page (the scraper used to hard-code 3); None processes the whole page.
+    """
+
+    def __init__(self, min_length=10, max_posts_per_page=None, allow_nsfw=True, min_score=None, min_comments=None,
+                 include_keywords=None, exclude_keywords=None, languages=None):
+        self.min_length = min_length
+        self.max_posts_per_page = max_posts_per_page
+        self.allow_nsfw = allow_nsfw
+        self.min_score = min_score
+        self.min_comments = min_comments
+        self.include_matcher = KeywordMatcher(include_keywords) if include_keywords else None
+        self.exclude_matcher = KeywordMatcher(exclude_keywords) if exclude_keywords else None
+        self.languages = set(languages) if languages else None
+        self.detect_language = None
+        if self.languages:
+            try:
+                from langdetect import DetectorFactory, detect
+            except ImportError as e:
+                raise ImportError("Filtering by language requires langdetect: pip install langdetect") from e
+            # detect() samples the text at random; with a fixed seed a post gets the same language on every run
+            DetectorFactory.seed = 0
+            self.detect_language = detect
+
+    def accepts(self, data):
+        selftext = data.get('selftext', '')
+        if len(selftext) <= self.min_length:
+            return False
+        if not self.allow_nsfw and data.get('over_18', False):
+            return False
+        if self.min_score is not None and data.get('score', 0) < self.min_score:
+            return False
+        if self.min_comments is not None and data.get('num_comments', 0) < self.min_comments:
+            return False
+        if self.include_matcher or self.exclude_matcher:
+            text = f"{data.get('title', '')} {selftext}"
+            if self.include_matcher and not self.include_matcher.search(text):
+                return False
+            if self.exclude_matcher and self.exclude_matcher.search(text):
+                return False
+        if self.languages:
+            try:
+                if self.detect_language(selftext) not in self.languages:
+                    return False
+            except Exception:
+                # langdetect raises on text without any usable features
+                return False
+        return True
+
+    def filter_posts(self, posts):
+        children = posts['data']['children']
+        if self.max_posts_per_page is not None:
+            children = children[:self.max_posts_per_page]
         filtered_posts = []
-        counter = 0
-        for post in posts['data']['children']:
-            counter += 1
-            selftext = post['data'].get('selftext', '')
-            if len( selftext) > min_length:
+        for post in children:
+            data = post['data']
+            if self.accepts(data):
                 filtered_posts.append({
-                    'title': post['data'].get('title', 'N/A'),
-                    #'category': post['data'].get('category', 'N/A'),
-                    #likes': post['data'].get('likes', 0),
-                    'num_comments': post['data'].get('num_comments', 0),
-                    'subreddit': post['data'].get('subreddit', 'N/A'),
-                    #'view_count': post['data'].get('view_count', 0),
-                    'selftext': selftext
+                    'title': data.get('title', 'N/A'),
+                    #'category': data.get('category', 'N/A'),
+                    #likes': data.get('likes', 0),
+                    'num_comments': data.get('num_comments', 0),
+                    'subreddit': data.get('subreddit', 'N/A'),
+                    #'view_count': data.get('view_count', 0),
+                    'selftext': data.get('selftext', ''),
+                    # Reddit's fullname (e.g. t3_abc123) identifies the post across listings and runs
+                    'fullname': data.get('name', ''),
+                    # Creation time (epoch seconds, UTC) for the time-bucketed sentiment rollups
+                    'created_utc': data.get('created_utc', '')
                 })
-            if counter == 3:
-                break
         return filtered_posts
 
 
+class SeenPostIndex:
+    """Persistent set of the fullnames of posts already written, so a post is only stored once across runs."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS seen_posts (fullname TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def unseen(self, posts):
+        """Returns the posts not recorded yet, also dropping repeats within posts. Posts without a fullname are kept."""
+        fullnames = list({post['fullname'] for post in posts if post.get('fullname')})
+        seen = set()
+        with self.lock:
+            rows = query_in_batches(self.connection,
+                                    "SELECT fullname FROM seen_posts WHERE fullname IN ({placeholders})", fullnames)
+            seen.update(fullname for fullname, in rows)
+        unseen_posts = []
+        for post in posts:
+            fullname = post.get('fullname')
+            if fullname:
+                if fullname in seen:
+                    continue
+                seen.add(fullname)
+            unseen_posts.append(post)
+        return unseen_posts
+
+    def add(self, posts):
+        """Records the fullnames of posts that have been written."""
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO seen_posts (fullname) VALUES (?)",
+                                        [(post['fullname'],) for post in posts if post.get('fullname')])
+
+    def close(self):
+        self.connection.close()
+
+
 class CSVWriter:
     @staticmethod
     def write_to_csv(file_path, posts):
         file_exists = os.path.exists(file_path)
         with open(file_path, mode='a' if file_exists else 'w', newline='', encoding='utf-8') as file:
             fieldnames = ['title', 'category', 'likes', 'num_comments', 'subreddit', 'view_count', 'selftext']
-            fieldnames = ['title', 'num_comments', 'subreddit', 'selftext']
+            fieldnames = ['title', 'num_comments', 'subreddit', 'selftext', 'fullname', 'created_utc']
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             if not file_exists:
                 writer.writeheader()
@@ -94,12 +624,128 @@ class JSONWriter:
             json.dump(data, file, ensure_ascii=False, indent=4)
 
 
+class JSONLinesWriter:
+    """Append-only JSON Lines output: one post per line, gzip-compressed when the path ends in '.gz'.
+
+    Appending a batch only writes that batch, and reading streams one record at a time.
+    """
+
+    @staticmethod
+    def open_file(file_path, mode):
+        if file_path.endswith('.gz'):
+            # Each append adds a gzip member; readers see the members as one stream
+            return gzip.open(file_path, mode + 't', encoding='utf-8')
+        return open(file_path, mode, encoding='utf-8')
+
+    @staticmethod
+    def write_to_json(file_path, posts):
+        if not posts:
+            return
+        with JSONLinesWriter.open_file(file_path, 'a') as file:
+            file.writelines(json.dumps(post, ensure_ascii=False) + '\n' for post in posts)
+
+    @staticmethod
+    def read_json_lines(file_path):
+        """Lazily yields the posts stored in a JSON Lines file."""
+        if not os.path.exists(file_path):
+            return
+        with JSONLinesWriter.open_file(file_path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+
+class CrawlWriter(threading.Thread):
+    """Writes post batches from a bounded queue on its own thread, so fetching and disk I/O overlap.
+
+    put() blocks while the queue is full, which slows the fetchers down to the writer's pace
+    (backpressure). Buffered posts are flushed every flush_every posts or flush_interval seconds,
+    so a crash loses at most one flush worth of data.
+    """
+
+    _STOP = object()
+
+    def __init__(self, store, max_queued_batches=64, flush_every=500, flush_interval=5.0, metrics=None):
+        super().__init__(name='crawl-writer', daemon=True)
+        self.store = store
+        self.queue = queue.Queue(maxsize=max_queued_batches)
+        self.metrics = metrics
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.error = None
+
+    def put(self, posts):
+        if posts:
+            self.queue.put(posts)
+            if self.metrics is not None:
+                self.metrics.observe_queue_depth(self.queue.qsize())
+
+    def run(self):
+        buffer = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                posts = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                posts = None
+            if self.metrics is not None:
+                self.metrics.observe_queue_depth(self.queue.qsize())
+            if posts is self._STOP:
+                self.flush(buffer)
+                return
+            if posts:
+                buffer.extend(posts)
+            if len(buffer) >= self.flush_every or time.monotonic() - last_flush >= self.flush_interval:
+                self.flush(buffer)
+                buffer = []
+                last_flush = time.monotonic()
+
+    def flush(self, buffer):
+        # After a failed write keep draining the queue so the fetchers never block forever
+        if not buffer or self.error is not None:
+            return
+        try:
+            self.store(buffer)
+        except Exception as e:
+            self.error = e
+            print(f"Error writing posts, later batches will be dropped: {e}")
+
+    def close(self):
+        """Flushes what is left, stops the thread and re-raises a write error if one happened."""
+        self.queue.put(self._STOP)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
 
 class JobHuntingPostScraper:
-    def __init__(self, client_id, client_secret, user_agent, csv_file_path, subreddits):
-        self.api = RedditAPI(client_id, client_secret, user_agent)
+    FETCH_MODES = ('sequential', 'threads')
+
+    def __init__(self, client_id, client_secret, user_agent, csv_file_path, subreddits,
+                 fetch_mode='sequential', max_in_flight=8, api=None, max_pages=1, subreddit_sort='top',
+                 checkpoint_path=None, seen_index_path=None, post_filter=None, max_queued_batches=64,
+                 flush_every=500, flush_interval=5.0):
+        if fetch_mode not in self.FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode '{fetch_mode}', expected one of {self.FETCH_MODES}")
+        self.api = api or RedditAPI(client_id, client_secret, user_agent)
+        # Requests, latency and retries are recorded by the API; posts and queue depth by the crawl
+        self.metrics = self.api.metrics
         self.subreddits = subreddits
         self.csv_file_path = self.generate_csv_file_path(csv_file_path)
+        self.fetch_mode = fetch_mode
+        self.max_in_flight = max(1, max_in_flight)
+        # Pages of up to 100 posts to follow per subreddit/keyword (None follows every page)
+        self.max_pages = max_pages
+        self.subreddit_sort = subreddit_sort
+        self.checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.seen_index = SeenPostIndex(seen_index_path) if seen_index_path else None
+        self.post_filter = post_filter or PostFilter()
+        # Bounded queue and flush policy between the fetchers and the CSV writer thread
+        self.max_queued_batches = max_queued_batches
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
 
     def generate_csv_file_path(self, base_file_path):
         # Get current date and time
@@ -116,33 +762,140 @@ class JobHuntingPostScraper:
     def fetch_and_store_posts(self):
         try:
             self.api.make_headers()
-            all_post_straps = []
-            for subreddit in self.subreddits:
-                try:
-                    posts = self.api.get_subreddit_posts(subreddit)
-                    filtered_posts = PostFilter.filter_posts(posts)
-                    all_post_straps.extend(filtered_posts)
-                except Exception as e:
-                    print(f"Error fetching or filtering posts for subreddit {subreddit}: {e}")
-            CSVWriter.write_to_csv(self.csv_file_path, all_post_straps)
+            self.crawl(self.subreddits, self.subreddit_pages,
+                       "Error fetching or filtering posts for subreddit {}")
         except Exception as e:
             print(f"Error in fetch_and_store_posts method: {e}")
 
     def search_and_store_posts(self, keywords):
         try:
             self.api.make_headers()
-            all_post_straps = []
-            for keyword in keywords:
-                try:
-                    posts = self.api.search_posts(keyword)
-                    filtered_posts = PostFilter.filter_posts(posts)
-                    all_post_straps.extend(filtered_posts)
-                except Exception as e:
-                    print(f"Error searching or filtering posts for keyword '{keyword}': {e}")
-            CSVWriter.write_to_csv(self.csv_file_path, all_post_straps)
+            self.crawl(keywords, self.search_pages,
+                       "Error searching or filtering posts for keyword '{}'")
         except Exception as e:
             print(f"Error in search_and_store_posts method: {e}")
 
+    def crawl(self, items, fetch, error_message):
+        """Fetches and filters every item with the configured fetch mode while a writer thread streams them to disk."""
+        writer = CrawlWriter(self.store_posts, max_queued_batches=self.max_queued_batches,
+                             flush_every=self.flush_every, flush_interval=self.flush_interval,
+                             metrics=self.metrics)
+        writer.start()
+        try:
+            if self.fetch_mode == 'threads':
+                self._crawl_with_threads(items, fetch, error_message, writer)
+            else:
+                for item in items:
+                    self.fetch_and_queue(item, fetch, error_message, writer)
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                # The checkpoint moved past posts that never reached disk; a later save() must not keep that
+                if self.checkpoint:
+                    self.checkpoint.reload()
+                raise
+
+        # Keep the old behaviour of always leaving a CSV (with header) behind
+        if not os.path.exists(self.csv_file_path):
+            CSVWriter.write_to_csv(self.csv_file_path, [])
+        if self.checkpoint:
+            self.checkpoint.save()
+
+    def subreddit_pages(self, subreddit):
+        key = f'subreddit:{subreddit}'
+        pages = self.api.iter_subreddit_posts(subreddit, sort=self.subreddit_sort, max_pages=self.max_pages,
+                                              after=self.resume_cursor(key))
+        return self.pages_since_checkpoint(key, pages, newest_first=self.subreddit_sort == 'new')
+
+    def search_pages(self, keyword):
+        key = f'search:{keyword}'
+        pages = self.api.iter_search_posts(keyword, sort='new', max_pages=self.max_pages,
+                                           after=self.resume_cursor(key))
+        return self.pages_since_checkpoint(key, pages, newest_first=True)
+
+    def resume_cursor(self, key):
+        return self.checkpoint.resume_cursor(key) if self.checkpoint else None
+
+    def pages_since_checkpoint(self, key, pages, newest_first):
+        """Drops posts already seen by an earlier crawl and moves the checkpoint to the newest post.
+
+        On newest-first listings paging stops at the first page that reaches the checkpoint. If
+        max_pages runs out first, the checkpoint stays put and the next crawl resumes where this one
+        stopped, so the posts in between are not skipped.
+        """
+        if self.checkpoint is None:
+            yield from pages
+            return
+        last_seen = self.checkpoint.get(key)
+        resume = dict(last_seen['resume']) if last_seen and 'resume' in last_seen else None
+        newest = None
+        reached_checkpoint = False
+        after = None
+        for page in pages:
+            children = page['data']['children']
+            fresh = [child for child in children if self.is_newer(child['data'], last_seen)]
+            for child in fresh:
+                if newest is None or child['data'].get('created_utc', 0) > newest.get('created_utc', 0):
+                    newest = child['data']
+            yield {**page, 'data': {**page['data'], 'children': fresh}}
+            after = page['data'].get('after')
+            if newest_first and len(fresh) < len(children):
+                reached_checkpoint = True
+                break
+        if newest_first and last_seen is not None and not reached_checkpoint and after:
+            if newest is not None:
+                self.checkpoint.suspend(key, after, newest.get('name'), newest.get('created_utc', 0))
+            return
+        if resume is not None:
+            # The gap is closed; the newest post of the interrupted crawl is newer than anything fetched since
+            self.checkpoint.update(key, resume['fullname'], resume['created_utc'])
+        elif newest is not None:
+            self.checkpoint.update(key, newest.get('name'), newest.get('created_utc', 0))
+
+    @staticmethod
+    def is_newer(post, last_seen):
+        if last_seen is None:
+            return True
+        created_utc = post.get('created_utc', 0)
+        return created_utc > last_seen['created_utc'] or \
+            (created_utc == last_seen['created_utc'] and post.get('name') != last_seen['fullname'])
+
+    def fetch_filtered_posts(self, item, fetch, error_message):
+        """Fetches and filters every page of one subreddit/keyword; a failure is reported and only skips that item."""
+        start = time.perf_counter()
+        try:
+            filtered_posts = []
+            for page in fetch(item):
+                filtered_posts.extend(self.post_filter.filter_posts(page))
+            return filtered_posts
+        except Exception as e:
+            print(f"{error_message.format(item)}: {e}")
+            return []
+        finally:
+            self.metrics.record_item(item, time.perf_counter() - start)
+
+    def fetch_and_queue(self, item, fetch, error_message, writer):
+        writer.put(self.fetch_filtered_posts(item, fetch, error_message))
+
+    def store_posts(self, filtered_posts):
+        # Posts already written by this or an earlier crawl never reach the CSV again
+        if self.seen_index is not None:
+            filtered_posts = self.seen_index.unseen(filtered_posts)
+        if filtered_posts:
+            CSVWriter.write_to_csv(self.csv_file_path, filtered_posts)
+            self.metrics.record_posts_written(len(filtered_posts))
+            # Only recorded once written, so a failed write does not hide the posts from the next run
+            if self.seen_index is not None:
+                self.seen_index.add(filtered_posts)
+
+    def _crawl_with_threads(self, items, fetch, error_message, writer):
+        # The pool size bounds the number of requests in flight; each worker hands its
+        # batch straight to the writer queue, so no results pile up here
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for item in items:
+                executor.submit(self.fetch_and_queue, item, fetch, error_message, writer)
+
 
 
 
@@ -749,8 +1502,13 @@ if __name__ == "__main__":
     # File path for CSV output
     csv_file_path = "data/redit_data_pull.csv"
 
-    # Initialize the scraper
-    scraper = JobHuntingPostScraper(client_id, client_secret, user_agent, csv_file_path, unique_subreddits)
+    # Initialize the scraper (fetch_mode can be 'sequential' or 'threads')
+    # A checkpoint file makes re-runs fetch only posts newer than the previous crawl
+    scraper = JobHuntingPostScraper(client_id, client_secret, user_agent, csv_file_path, unique_subreddits,
+                                    fetch_mode='threads', max_in_flight=8,
+                                    checkpoint_path="crawl_checkpoint.json", seen_index_path="seen_posts.sqlite",
+                                    api=RedditAPI(client_id, client_secret, user_agent,
+                                                  token_cache_path="reddit_token.json"))
 
     # Fetch posts from subreddits and save to CSV
     scraper.fetch_and_store_posts()
@@ -761,3 +1519,15 @@ if __name__ == "__main__":
 
     # Search posts based on keywords and save to CSV
     scraper.search_and_store_posts(bad_job_hunting_keywords)
+
+    # Crawl report: how many TCP/TLS handshakes the pooled session saved
+    print(f"Connection stats: {scraper.api.connection_stats()}")
+
+    # Telemetry summary (latency percentiles per endpoint, retries, 429s, posts/sec) plus a
+    # Prometheus text file for the node exporter; scraper.metrics.serve_prometheus(port) exposes it live instead
+    scraper.metrics.write_json("crawl_metrics.json", extra={'connections': scraper.api.connection_stats()})
+    scraper.metrics.write_prometheus("crawl_metrics.prom")
+    summary = scraper.metrics.summary()
+    print(f"Crawl metrics: {summary['requests']} requests, {summary['retries']} retries, "
+          f"{summary['rate_limited_429']} rate limited, {summary['posts_per_second']:.1f} posts/sec")
+    scraper.api.close()
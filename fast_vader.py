@@ -0,0 +1,263 @@
+#Done By Dacorie Smith
+
+import importlib.util
+import math
+import os
+import pickle
+import re
+import string
+
+from persistence import atomic_write
+
+
+def nltk_fingerprint():
+    """Identifies the installed NLTK by the size and mtime of its __init__.py, without importing it."""
+    spec = importlib.util.find_spec('nltk')
+    if spec is None or spec.origin is None:
+        return None
+    stat = os.stat(spec.origin)
+    return spec.origin, stat.st_size, stat.st_mtime_ns
+
+
+def load_vader_tables():
+    """Collects the lexicon and VADER rule tables from NLTK, which parses the lexicon text file."""
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from nltk.sentiment.vader import VaderConstants
+
+    return {
+        'nltk_version': nltk.__version__,
+        'nltk_fingerprint': nltk_fingerprint(),
+        'lexicon': SentimentIntensityAnalyzer().lexicon,
+        'punc_list': list(VaderConstants.PUNC_LIST),
+        'negate': frozenset(VaderConstants.NEGATE),
+        'booster_dict': dict(VaderConstants.BOOSTER_DICT),
+        'special_case_idioms': dict(VaderConstants.SPECIAL_CASE_IDIOMS),
+        'b_decr': VaderConstants.B_DECR,
+        'c_incr': VaderConstants.C_INCR,
+        'n_scalar': VaderConstants.N_SCALAR,
+    }
+
+
+def load_cached_vader_tables(cache_path):
+    """Loads the tables pickled by an earlier run, or builds them from NLTK and pickles them to cache_path.
+
+    Unpickling takes about a millisecond, while importing NLTK and parsing the lexicon takes a few hundred.
+    The cache is rebuilt when the installed NLTK changes.
+    """
+    try:
+        with open(cache_path, 'rb') as file:
+            tables = pickle.load(file)
+        if tables.get('nltk_fingerprint') == nltk_fingerprint():
+            return tables
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+        pass
+    tables = load_vader_tables()
+    with atomic_write(cache_path, 'wb') as file:
+        pickle.dump(tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return tables
+
+
+class FastSentimentIntensityAnalyzer:
+    """Drop-in replacement for NLTK's SentimentIntensityAnalyzer.polarity_scores with identical output.
+
+    NLTK builds a dictionary of every word glued to every punctuation mark for each text, and
+    lowercases the same words again for every rule that looks at them. Here a token is only
+    stripped of punctuation when it starts or ends with some, each word is lowercased once,
+    and the rules, constants and lexicon are the same. NLTK scores a repeated word at its first
+    position, so the valence is computed once per distinct word and reused.
+    """
+
+    PUNCTUATION_CHARS = frozenset(string.punctuation)
+    # Punctuation glued to one side of a word ('great!', '"hello'); the word itself has none
+    LEADING_PUNCTUATION = re.compile(f"([{re.escape(string.punctuation)}]+)([^{re.escape(string.punctuation)}]{{2,}})")
+    TRAILING_PUNCTUATION = re.compile(f"([^{re.escape(string.punctuation)}]{{2,}})([{re.escape(string.punctuation)}]+)")
+
+    def __init__(self, tables=None):
+        # The lexicon and rule tables come from NLTK (or its pickled copy), so the scores always match
+        tables = tables if tables is not None else load_vader_tables()
+        self.nltk_version = tables['nltk_version']
+        self.lexicon = tables['lexicon']
+        self.punctuation_marks = frozenset(tables['punc_list'])
+        self.negations = frozenset(tables['negate'])
+        self.boosters = tables['booster_dict']
+        self.idioms = tables['special_case_idioms']
+        self.b_decr = tables['b_decr']
+        self.c_incr = tables['c_incr']
+        self.n_scalar = tables['n_scalar']
+
+    @classmethod
+    def from_cache(cls, cache_path):
+        return cls(load_cached_vader_tables(cache_path))
+
+    def tokenize(self, text):
+        """Whitespace tokens of at least two characters, with PUNC_LIST punctuation removed from one side."""
+        tokens = []
+        punctuation_chars = self.PUNCTUATION_CHARS
+        for token in text.split():
+            if len(token) < 2:
+                continue
+            if token[0] in punctuation_chars:
+                match = self.LEADING_PUNCTUATION.fullmatch(token)
+                if match and match.group(1) in self.punctuation_marks:
+                    token = match.group(2)
+            elif token[-1] in punctuation_chars:
+                match = self.TRAILING_PUNCTUATION.fullmatch(token)
+                if match and match.group(2) in self.punctuation_marks:
+                    token = match.group(1)
+            tokens.append(token)
+        return tokens
+
+    def is_negation(self, word_lower):
+        return word_lower in self.negations or "n't" in word_lower
+
+    def scalar_inc_dec(self, word, word_lower, valence, is_cap_diff):
+        scalar = 0.0
+        if word_lower in self.boosters:
+            scalar = self.boosters[word_lower]
+            if valence < 0:
+                scalar *= -1
+            if word.isupper() and is_cap_diff:
+                if valence > 0:
+                    scalar += self.c_incr
+                else:
+                    scalar -= self.c_incr
+        return scalar
+
+    def never_check(self, valence, words, lowered, start_i, i):
+        if start_i == 0:
+            if self.is_negation(lowered[i - 1]):
+                valence = valence * self.n_scalar
+        elif start_i == 1:
+            if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                valence = valence * 1.5
+            elif self.is_negation(lowered[i - 2]):
+                valence = valence * self.n_scalar
+        else:
+            if (words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")) or \
+                    (words[i - 1] == "so" or words[i - 1] == "this"):
+                valence = valence * 1.25
+            elif self.is_negation(lowered[i - 3]):
+                valence = valence * self.n_scalar
+        return valence
+
+    def idioms_check(self, valence, words, i):
+        # Case-sensitive, like NLTK: only lowercase idioms match
+        onezero = f"{words[i - 1]} {words[i]}"
+        twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+        twoone = f"{words[i - 2]} {words[i - 1]}"
+        threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+        threetwo = f"{words[i - 3]} {words[i - 2]}"
+        for sequence in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if sequence in self.idioms:
+                valence = self.idioms[sequence]
+                break
+        if len(words) - 1 > i:
+            zeroone = f"{words[i]} {words[i + 1]}"
+            if zeroone in self.idioms:
+                valence = self.idioms[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+            if zeroonetwo in self.idioms:
+                valence = self.idioms[zeroonetwo]
+        if threetwo in self.boosters or twoone in self.boosters:
+            valence = valence + self.b_decr
+        return valence
+
+    def least_check(self, valence, lowered, i):
+        if i > 1 and lowered[i - 1] not in self.lexicon and lowered[i - 1] == "least":
+            if lowered[i - 2] != "at" and lowered[i - 2] != "very":
+                valence = valence * self.n_scalar
+        elif i > 0 and lowered[i - 1] not in self.lexicon and lowered[i - 1] == "least":
+            valence = valence * self.n_scalar
+        return valence
+
+    def word_valence(self, words, lowered, i, is_cap_diff):
+        """Valence of the word at position i after the booster, negation, idiom and 'least' rules."""
+        word_lower = lowered[i]
+        if word_lower in self.boosters or (word_lower == "kind" and i < len(words) - 1 and lowered[i + 1] == "of"):
+            return 0
+        valence = self.lexicon.get(word_lower)
+        if valence is None:
+            return 0
+        if words[i].isupper() and is_cap_diff:
+            if valence > 0:
+                valence += self.c_incr
+            else:
+                valence -= self.c_incr
+        for start_i in range(0, 3):
+            if i > start_i and lowered[i - (start_i + 1)] not in self.lexicon:
+                s = self.scalar_inc_dec(words[i - (start_i + 1)], lowered[i - (start_i + 1)], valence, is_cap_diff)
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self.never_check(valence, words, lowered, start_i, i)
+                if start_i == 2:
+                    valence = self.idioms_check(valence, words, i)
+        return self.least_check(valence, lowered, i)
+
+    def polarity_scores(self, text):
+        if not isinstance(text, str):
+            text = str(text.encode("utf-8"))
+        words = self.tokenize(text)
+        lowered = [word.lower() for word in words]
+        allcap_words = sum(1 for word in words if word.isupper())
+        is_cap_diff = 0 < len(words) - allcap_words < len(words)
+
+        sentiments = []
+        valences = {}
+        for i, word in enumerate(words):
+            valence = valences.get(word)
+            if valence is None:
+                valence = valences[word] = self.word_valence(words, lowered, i, is_cap_diff)
+            sentiments.append(valence)
+
+        if "but" in lowered:
+            but_index = lowered.index("but")
+            for i, sentiment in enumerate(sentiments):
+                if i < but_index:
+                    sentiments[i] = sentiment * 0.5
+                elif i > but_index:
+                    sentiments[i] = sentiment * 1.5
+        return self.score_valence(sentiments, text)
+
+    @staticmethod
+    def score_valence(sentiments, text):
+        if not sentiments:
+            return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+        sum_s = float(sum(sentiments))
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+        pos_sum = 0.0
+        neg_sum = 0.0
+        neu_count = 0
+        for sentiment_score in sentiments:
+            if sentiment_score > 0:
+                pos_sum += float(sentiment_score) + 1
+            if sentiment_score < 0:
+                neg_sum += float(sentiment_score) - 1
+            if sentiment_score == 0:
+                neu_count += 1
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct_emph_amplifier
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct_emph_amplifier
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            "neg": round(math.fabs(neg_sum / total), 3),
+            "neu": round(math.fabs(neu_count / total), 3),
+            "pos": round(math.fabs(pos_sum / total), 3),
+            "compound": round(compound, 4),
+        }
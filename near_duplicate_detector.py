@@ -0,0 +1,177 @@
+#Done By Dacorie Smith
+
+import pickle
+import re
+import zlib
+
+import numpy as np
+
+from persistence import atomic_write
+
+
+class NearDuplicateDetector:
+    """Finds near-duplicate posts with word shingles, MinHash signatures and an LSH banding index.
+
+    Each post is reduced to num_perm MinHash values. The signature is cut into bands, and posts
+    sharing any band become candidates, so a lookup costs O(bands) instead of a scan over every
+    post seen. Candidates are confirmed by comparing signatures against the similarity threshold
+    (estimated Jaccard similarity of the shingle sets).
+
+    Every indexed post remembers the source (input file) it came from. start_source() retires the
+    posts an earlier pass indexed for that source, so reprocessing a file does not match its rows
+    against themselves.
+    """
+
+    # Largest Mersenne prime below 2**64, as used by the usual MinHash permutation family
+    MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+    MAX_HASH = np.uint64((1 << 32) - 1)
+    WORD_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, threshold=0.8, num_perm=64, shingle_size=3, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = self.optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.band_multipliers = rng.randint(1, (1 << 63) - 1, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.signatures = []
+        self.sources = []
+        self.buckets = [{} for _ in range(self.bands)]
+        self.retired = set()
+        self.source = None
+        self.duplicates_dropped = 0
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def optimal_bands(threshold, num_perm):
+        """Picks bands x rows whose LSH S-curve midpoint (1/bands) ** (1/rows) is closest to threshold."""
+        best = None
+        for rows in range(1, num_perm + 1):
+            bands = num_perm // rows
+            error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+        return best[1], best[2]
+
+    def shingles(self, text):
+        """Hashes the overlapping word n-grams of the lowercased text; crc32 keeps them stable across runs."""
+        words = self.WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            words_per_shingle = [' '.join(words)]
+        else:
+            words_per_shingle = [' '.join(words[i:i + self.shingle_size])
+                                 for i in range(len(words) - self.shingle_size + 1)]
+        return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in set(words_per_shingle)),
+                           dtype=np.uint64)
+
+    def signature(self, text):
+        shingles = self.shingles(text)
+        # (a * x + b) mod p for every permutation and shingle; uint64 arithmetic wraps like the reference scheme
+        hashed = (np.outer(shingles, self.perm_a) + self.perm_b) % self.MERSENNE_PRIME & self.MAX_HASH
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature):
+        bands = signature[:self.bands * self.rows].astype(np.uint64).reshape(self.bands, self.rows)
+        return (bands * self.band_multipliers).sum(axis=1).tolist()
+
+    def start_source(self, source):
+        """Starts a pass over source: posts indexed from it earlier are no longer matched, and new ones are tagged with it."""
+        self.source = source
+        self.retired.update(doc_id for doc_id, doc_source in enumerate(self.sources)
+                            if doc_source == source and source is not None)
+
+    def similarity(self, signature, doc_id):
+        return float(np.mean(self.signatures[doc_id] == signature))
+
+    def find_duplicate(self, signature, band_keys):
+        """Returns the id of an indexed post at least threshold-similar to signature, or None."""
+        checked = set()
+        for bucket, key in zip(self.buckets, band_keys):
+            candidates = bucket.get(key)
+            if candidates is None:
+                continue
+            for doc_id in candidates if isinstance(candidates, list) else (candidates,):
+                if doc_id not in checked and doc_id not in self.retired:
+                    checked.add(doc_id)
+                    if self.similarity(signature, doc_id) >= self.threshold:
+                        return doc_id
+        return None
+
+    def add_signature(self, signature, band_keys):
+        doc_id = len(self.signatures)
+        self.signatures.append(signature)
+        self.sources.append(self.source)
+        for bucket, key in zip(self.buckets, band_keys):
+            # Most buckets hold a single post, so a bare id is stored until a second one arrives
+            existing = bucket.get(key)
+            if existing is None:
+                bucket[key] = doc_id
+            elif isinstance(existing, list):
+                existing.append(doc_id)
+            else:
+                bucket[key] = [existing, doc_id]
+        return doc_id
+
+    def check_and_add(self, text):
+        """Returns the id of the post text duplicates, or indexes text and returns None if it is new."""
+        signature = self.signature(text)
+        band_keys = self.band_keys(signature)
+        duplicate_of = self.find_duplicate(signature, band_keys)
+        if duplicate_of is None:
+            self.add_signature(signature, band_keys)
+        else:
+            self.duplicates_dropped += 1
+        return duplicate_of
+
+    def filter(self, df, columns=('title', 'selftext')):
+        """Drops rows that near-duplicate a post already in the index and indexes the rest."""
+        texts = df[columns[0]].astype(str)
+        for column in columns[1:]:
+            texts = texts + ' ' + df[column].astype(str)
+        keep = np.array([self.check_and_add(text) is None for text in texts], dtype=bool)
+        return df[keep]
+
+    def compact(self):
+        """Drops retired posts and rebuilds the band buckets; doc ids are renumbered."""
+        if not self.retired:
+            return
+        kept = [doc_id for doc_id in range(len(self.signatures)) if doc_id not in self.retired]
+        signatures = [self.signatures[doc_id] for doc_id in kept]
+        sources = [self.sources[doc_id] for doc_id in kept]
+        self.signatures, self.sources, self.retired = [], [], set()
+        self.buckets = [{} for _ in range(self.bands)]
+        current_source = self.source
+        for signature, source in zip(signatures, sources):
+            self.source = source
+            self.add_signature(signature, self.band_keys(signature))
+        self.source = current_source
+
+    def save(self, file_path):
+        self.compact()
+        state = {
+            'threshold': self.threshold,
+            'num_perm': self.num_perm,
+            'shingle_size': self.shingle_size,
+            'seed': self.seed,
+            'signatures': np.vstack(self.signatures) if self.signatures else np.empty((0, self.num_perm), np.uint32),
+            'sources': self.sources,
+            'buckets': self.buckets,
+        }
+        with atomic_write(file_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path):
+        """Restores an index written by save(), so new crawls are checked against earlier ones."""
+        with open(file_path, 'rb') as file:
+            state = pickle.load(file)
+        detector = cls(state['threshold'], state['num_perm'], state['shingle_size'], state['seed'])
+        detector.signatures = list(state['signatures'])
+        detector.sources = state['sources']
+        detector.buckets = state['buckets']
+        return detector
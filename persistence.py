@@ -0,0 +1,31 @@
+#Done By Dacorie Smith
+
+import os
+from contextlib import contextmanager
+
+# SQLite limits the number of bound parameters per statement
+SQLITE_QUERY_BATCH_SIZE = 500
+
+
+@contextmanager
+def atomic_write(file_path, mode='w', permissions=0o666):
+    """Opens a temporary file next to file_path and moves it into place once the block succeeds.
+
+    Readers (and an interrupted run) only ever see the old file or the complete new one. The file
+    is created with the given permissions, e.g. 0o600 for credentials.
+    """
+    temp_path = f"{file_path}.tmp"
+    descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, permissions)
+    with os.fdopen(descriptor, mode, encoding=None if 'b' in mode else 'utf-8') as file:
+        yield file
+    os.replace(temp_path, file_path)
+
+
+def query_in_batches(connection, query, values, batch_size=SQLITE_QUERY_BATCH_SIZE):
+    """Runs query for values in batches SQLite accepts and yields every row.
+
+    The query writes its IN list as ({placeholders}), e.g. "SELECT key FROM cache WHERE key IN ({placeholders})".
+    """
+    for start in range(0, len(values), batch_size):
+        batch = values[start:start + batch_size]
+        yield from connection.execute(query.format(placeholders=','.join('?' * len(batch))), batch)
@@ -1,25 +1,89 @@
 #Done By Dacorie Smith
 
+import argparse
+import hashlib
 import json
-
-import pandas as pd
-import csv
+import math
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
 import os
-from nltk.sentiment import SentimentIntensityAnalyzer
 from datetime import datetime
 
+# pandas and NLTK take most of the start-up time, so they are imported inside the functions
+# that use them; a run with nothing new to process never loads them
+
+from fast_vader import FastSentimentIntensityAnalyzer
+from near_duplicate_detector import NearDuplicateDetector
+from persistence import atomic_write, query_in_batches
+from sentiment_rollup import SentimentRollup
+
+# Both produce identical scores; 'fast' is the faster reimplementation in fast_vader
+SENTIMENT_SCORERS = ('fast', 'nltk')
+
+
+def make_sentiment_scorer(scorer='fast', lexicon_cache_path=None):
+    """Builds the scorer; the fast one loads its lexicon from lexicon_cache_path when given."""
+    if scorer not in SENTIMENT_SCORERS:
+        raise ValueError(f"Unknown sentiment scorer '{scorer}', expected one of {SENTIMENT_SCORERS}")
+    if scorer == 'fast':
+        if lexicon_cache_path:
+            return FastSentimentIntensityAnalyzer.from_cache(lexicon_cache_path)
+        return FastSentimentIntensityAnalyzer()
+    # NLTK takes a few hundred milliseconds to import, so it is only loaded when asked for
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def score_texts(sia, texts):
+    """Scores texts with a SentimentIntensityAnalyzer and returns the neg/neu/pos/compound scores as float arrays."""
+    scores = np.empty((len(texts), 4), dtype=np.float64)
+    polarity_scores = sia.polarity_scores
+    for i, text in enumerate(texts):
+        sentiment_score = polarity_scores(text)
+        scores[i] = (sentiment_score['neg'], sentiment_score['neu'], sentiment_score['pos'],
+                     sentiment_score['compound'])
+    return {
+        'neg': scores[:, 0],
+        'neu': scores[:, 1],
+        'pos': scores[:, 2],
+        'compound': scores[:, 3],
+    }
+
+
+# Each process-pool worker builds its own analyzer once, in _init_sentiment_worker
+_worker_sia = None
+
+
+def _init_sentiment_worker(scorer='fast', lexicon_cache_path=None):
+    global _worker_sia
+    _worker_sia = make_sentiment_scorer(scorer, lexicon_cache_path)
+
+
+def _score_texts_in_worker(texts):
+    return score_texts(_worker_sia, texts)
+
 
 class CSVHandler:
     def __init__(self, folder_path, columns):
         self.folder_path = folder_path
         self.columns = columns
 
-    def get_all_csv_files(self):
-        """Retrieves all CSV files from the given folder."""
-        return [f for f in os.listdir(self.folder_path) if f.endswith('.csv')]
+    # Marker SentimentAnalyzer puts in the names of the files it writes
+    OUTPUT_MARKER = '_with_sentiment_'
+
+    def get_all_csv_files(self, include_outputs=False):
+        """Retrieves all CSV files from the given folder, skipping our own sentiment outputs by default."""
+        return [f for f in os.listdir(self.folder_path)
+                if f.endswith('.csv') and (include_outputs or self.OUTPUT_MARKER not in f)]
 
     def read_csv(self, csv_file_path):
         """Reads a CSV file into a pandas DataFrame."""
+        import pandas as pd
         full_path = os.path.join(self.folder_path, csv_file_path)
         if os.path.exists(full_path):
             return pd.read_csv(full_path, encoding='utf-8')
@@ -32,6 +96,61 @@ class CSVHandler:
         df.to_csv(full_path, index=False, encoding='utf-8')
 
 
+class ProcessedFilesManifest:
+    """Remembers which input files were processed (size, mtime, content hash, outputs) so unchanged ones are skipped."""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.entries = self.load()
+
+    def load(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        return {}
+
+    def save(self):
+        with atomic_write(self.manifest_path) as file:
+            json.dump(self.entries, file, indent=4)
+
+    @staticmethod
+    def file_hash(file_path):
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_processed(self, file_path):
+        """True when file_path is unchanged since it was recorded; only hashes when size matches but mtime moved."""
+        entry = self.entries.get(file_path)
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if self.file_hash(file_path) != entry['sha256']:
+            return False
+        # Touched but not modified: remember the new mtime so the next check is stat-only again
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def record(self, file_path, outputs):
+        stat = os.stat(file_path)
+        self.entries[file_path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self.file_hash(file_path),
+            'outputs': outputs,
+        }
+
+    def outputs(self):
+        """Every file produced by a recorded run."""
+        return {output for entry in self.entries.values() for output in entry['outputs']}
+
+
 class DataProcessor:
     def __init__(self, df):
         self.df = df
@@ -44,12 +163,196 @@ class DataProcessor:
         return self.df
 
 
+class HashSet64:
+    """Compact set of 64-bit hashes (8 bytes per entry) kept as sorted NumPy runs.
+
+    New hashes form a run; runs are merged whenever the newest is at least half the size of the
+    one before it, so there are only O(log n) runs to search.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.unique(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], newest)
+
+
+class BloomFilter:
+    """Bloom filter over 64-bit hashes; fixed memory for a target capacity and false-positive rate.
+
+    A false positive makes a new row look like a duplicate, so rows can occasionally be dropped
+    (at roughly false_positive_rate) but a duplicate is never kept.
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.001):
+        self.num_bits = max(64, int(math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def bit_positions(self, hashes):
+        # Double hashing: the k probe positions are derived from the two halves of each 64-bit hash
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.num_hashes, dtype=np.uint64)
+        return (low[:, None] + probes[None, :] * high[:, None]) % np.uint64(self.num_bits)
+
+    def contains(self, hashes):
+        positions = self.bit_positions(hashes)
+        bits_set = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits_set.all(axis=1)
+
+    def add(self, hashes):
+        positions = self.bit_positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                         np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+        self.count += len(hashes)
+
+
+class StreamingDeduplicator:
+    """Drops rows whose key columns were already seen in an earlier row or chunk, keeping the first occurrence.
+
+    Only a 64-bit hash of each key is kept, in a HashSet64 (exact) or a BloomFilter (fixed memory).
+    Sharing one instance between files deduplicates across all of them.
+    """
+
+    MODES = ('exact', 'bloom')
+
+    def __init__(self, subset_columns, mode='exact', expected_rows=10000000, false_positive_rate=0.001):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedup mode '{mode}', expected one of {self.MODES}")
+        self.subset_columns = subset_columns
+        self.seen = HashSet64() if mode == 'exact' else BloomFilter(expected_rows, false_positive_rate)
+        self.rows_seen = 0
+        self.duplicates_dropped = 0
+
+    def row_hashes(self, df):
+        import pandas as pd
+        # Stable across processes and runs, unlike hash()
+        return pd.util.hash_pandas_object(df[self.subset_columns], index=False).to_numpy()
+
+    def filter(self, df):
+        hashes = self.row_hashes(df)
+        # First occurrence within this chunk, then drop anything seen in earlier chunks
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[np.unique(hashes, return_index=True)[1]] = True
+        keep &= ~self.seen.contains(hashes)
+        self.seen.add(hashes[keep])
+        self.rows_seen += len(hashes)
+        self.duplicates_dropped += len(hashes) - int(keep.sum())
+        return df[keep]
+
+
+class SentimentCache:
+    """Sentiment scores keyed by a hash of the analyzed text and lexicon version.
+
+    An in-memory LRU sits in front of a SQLite table so scores survive between runs.
+    """
+
+    def __init__(self, db_path, max_memory_entries=100000):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache "
+            "(key TEXT PRIMARY KEY, neg REAL, neu REAL, pos REAL, compound REAL)")
+
+    @staticmethod
+    def lexicon_version(sia):
+        """Identifies the scorer: NLTK version plus a digest of the loaded lexicon."""
+        digest = hashlib.sha1(repr(sorted(sia.lexicon.items())).encode('utf-8')).hexdigest()[:16]
+        nltk_version = getattr(sia, 'nltk_version', None)
+        if nltk_version is None:
+            import nltk
+            nltk_version = nltk.__version__
+        return f"{nltk_version}:{digest}"
+
+    @staticmethod
+    def make_key(text, lexicon_version):
+        # VADER splits on whitespace, so collapsing runs of it cannot change the scores
+        normalized = ' '.join(text.split())
+        return hashlib.blake2b(f"{lexicon_version}\0{normalized}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many(self, keys):
+        """Returns {key: (neg, neu, pos, compound)} for every key found in memory or on disk."""
+        found = {}
+        on_disk = []
+        for key in keys:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                found[key] = self.memory[key]
+            else:
+                on_disk.append(key)
+        unique_on_disk = list(dict.fromkeys(on_disk))
+        query = "SELECT key, neg, neu, pos, compound FROM sentiment_cache WHERE key IN ({placeholders})"
+        for key, neg, neu, pos, compound in query_in_batches(self.connection, query, unique_on_disk):
+            found[key] = (neg, neu, pos, compound)
+            self.remember(key, found[key])
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items):
+        """Stores (key, (neg, neu, pos, compound)) pairs in memory and on disk."""
+        items = list(items)
+        for key, scores in items:
+            self.remember(key, scores)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, neg, neu, pos, compound) VALUES (?, ?, ?, ?, ?)",
+                [(key, *scores) for key, scores in items])
+
+    def remember(self, key, scores):
+        self.memory[key] = scores
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.connection.close()
+
+
 class SentimentAnalyzer:
-    def __init__(self, input_file_path, folder_path):
+    def __init__(self, input_file_path, folder_path, cache=None, scorer='fast', lexicon_cache_path=None):
         self.input_file_path = input_file_path
         self.folder_path = folder_path
         self.updated_file_path = self.generate_updated_csv_path()
-        self.sia = SentimentIntensityAnalyzer()
+        self.scorer = scorer
+        self.lexicon_cache_path = lexicon_cache_path
+        self.sia = make_sentiment_scorer(scorer, lexicon_cache_path)
+        self.cache = cache
+        self.lexicon_version = SentimentCache.lexicon_version(self.sia) if cache is not None else None
 
     def generate_updated_csv_path(self):
         """Generates the file path for the updated CSV by appending the current timestamp."""
@@ -68,30 +371,100 @@ class SentimentAnalyzer:
         else:
             return 'neutral'
 
-    def analyze_and_update_csv(self):
-        """Reads the CSV, performs sentiment analysis, and writes the updated rows to a new CSV."""
-        with open(self.input_file_path, mode='r', newline='', encoding='utf-8') as file, \
-                open(self.updated_file_path, mode='w', newline='', encoding='utf-8') as updated_file:
-            reader = csv.DictReader(file)
-            fieldnames = reader.fieldnames + ['neg_sentiment', 'neu_sentiment', 'pos_sentiment', 'compound_sentiment',
-                                              'overall_sentiment']
-            writer = csv.DictWriter(updated_file, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for row in reader:
-                # Perform sentiment analysis on the concatenated title and selftext columns
-                text_to_analyze = row['title'] + row.get('selftext', '')
-                sentiment_score = self.sia.polarity_scores(text_to_analyze)
-
-                # Add sentiment scores to the row
-                row['neg_sentiment'] = sentiment_score['neg']
-                row['neu_sentiment'] = sentiment_score['neu']
-                row['pos_sentiment'] = sentiment_score['pos']
-                row['compound_sentiment'] = sentiment_score['compound']
-                row['overall_sentiment'] = self.categorize_sentiment(sentiment_score['compound'])
-
-                # Write the updated row to the new CSV
-                writer.writerow(row)
+    @staticmethod
+    def categorize_sentiments(compound_scores):
+        """Vectorized categorize_sentiment over an array of compound scores."""
+        compound_scores = np.asarray(compound_scores)
+        return np.select([compound_scores > 0.05, compound_scores < -0.05], ['good', 'bad'], default='neutral')
+
+    def score_batch(self, texts):
+        """Scores a batch of texts and returns the neg/neu/pos/compound scores as float arrays."""
+        lookup = self.lookup_cached(texts)
+        missing_texts = [texts[i] for i in lookup[2]]
+        return self.merge_scores(lookup, score_texts(self.sia, missing_texts))
+
+    def lookup_cached(self, texts):
+        """Returns (keys, cached scores, indexes of the texts that still need scoring)."""
+        if self.cache is None:
+            return None, None, list(range(len(texts)))
+        keys = [self.cache.make_key(text, self.lexicon_version) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        return keys, cached, missing
+
+    def merge_scores(self, lookup, missing_scores):
+        """Combines cached scores with freshly computed ones and stores the new ones in the cache."""
+        keys, cached, missing = lookup
+        if keys is None:
+            return missing_scores
+        scores = np.empty((len(keys), 4), dtype=np.float64)
+        for i, key in enumerate(keys):
+            if key in cached:
+                scores[i] = cached[key]
+        if missing:
+            new_scores = np.column_stack([missing_scores['neg'], missing_scores['neu'], missing_scores['pos'],
+                                          missing_scores['compound']])
+            scores[missing] = new_scores
+            self.cache.put_many((keys[i], tuple(row)) for i, row in zip(missing, new_scores.tolist()))
+        return {
+            'neg': scores[:, 0],
+            'neu': scores[:, 1],
+            'pos': scores[:, 2],
+            'compound': scores[:, 3],
+        }
+
+    @staticmethod
+    def texts_to_score(df):
+        """The text analyzed for each row: title followed by selftext."""
+        texts = df['title'] + df['selftext'] if 'selftext' in df.columns else df['title']
+        return texts.tolist()
+
+    def add_sentiment_columns(self, df, scores):
+        """Returns a copy of df with the sentiment columns built from a score_batch result."""
+        df = df.copy()
+        df['neg_sentiment'] = scores['neg']
+        df['neu_sentiment'] = scores['neu']
+        df['pos_sentiment'] = scores['pos']
+        df['compound_sentiment'] = scores['compound']
+        df['overall_sentiment'] = self.categorize_sentiments(scores['compound'])
+        return df
+
+    def score_dataframe(self, df):
+        """Returns a copy of df with the sentiment columns added, scoring title + selftext."""
+        return self.add_sentiment_columns(df, self.score_batch(self.texts_to_score(df)))
+
+    def analyze_and_update_csv(self, chunk_size=10000, workers=1):
+        """Reads the CSV in chunks, scores each chunk as a batch, and writes the updated rows to a new CSV.
+
+        With workers > 1 the chunks are scored in a process pool and written back in their original order.
+        """
+        pipeline = SentimentPipeline(self.input_file_path, self, [CSVSink(self.updated_file_path)],
+                                     chunk_size=chunk_size, workers=workers)
+        pipeline.run()
+
+    def score_chunks(self, chunks, workers=1):
+        """Yields each chunk with its sentiment columns added, in input order."""
+        if workers > 1:
+            return self.score_chunks_in_parallel(chunks, workers)
+        return (self.score_dataframe(chunk) for chunk in chunks)
+
+    def score_chunks_in_parallel(self, chunks, workers):
+        """Yields scored chunks in input order while keeping at most two chunks per worker in flight."""
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sentiment_worker,
+                                 initargs=(self.scorer, self.lexicon_cache_path)) as executor:
+            # Cache lookups stay in this process; only the texts that missed are sent to the workers
+            pending = deque()
+            for chunk in chunks:
+                texts = self.texts_to_score(chunk)
+                lookup = self.lookup_cached(texts)
+                future = executor.submit(_score_texts_in_worker, [texts[i] for i in lookup[2]])
+                pending.append((chunk, lookup, future))
+                if len(pending) >= workers * 2:
+                    chunk, lookup, future = pending.popleft()
+                    yield self.add_sentiment_columns(chunk, self.merge_scores(lookup, future.result()))
+            while pending:
+                chunk, lookup, future = pending.popleft()
+                yield self.add_sentiment_columns(chunk, self.merge_scores(lookup, future.result()))
 
 class JSONHandler:
     def __init__(self, folder_path):
@@ -113,7 +486,262 @@ class JSONHandler:
             return []
 
 
-def main():
+class CSVSink:
+    """Streams scored chunks into a CSV file, writing the header with the first chunk."""
+
+    name = 'write_csv'
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, mode='w', newline='', encoding='utf-8')
+        self.header_written = False
+
+    def write(self, df):
+        df.to_csv(self.file, index=False, header=not self.header_written)
+        self.header_written = True
+
+    def close(self):
+        self.file.close()
+
+
+class JSONSink:
+    """Streams scored chunks into a JSON array laid out like json.dump(records, indent=4)."""
+
+    name = 'write_json'
+
+    def __init__(self, file_path, numeric_columns=('num_comments', 'created_utc')):
+        self.file_path = file_path
+        # Rows are read as text; these columns are written back as JSON numbers
+        self.numeric_columns = numeric_columns
+        self.file = open(file_path, 'w', encoding='utf-8')
+        self.records_written = 0
+        self.file.write('[')
+
+    @staticmethod
+    def to_number(value):
+        """The number a CSV field holds, written as it reads: '12' as 12, '1700000000.0' as 1700000000.0."""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            pass
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None if value == '' else value
+        return number if math.isfinite(number) else value
+
+    def write(self, df):
+        for record in df.to_dict(orient='records'):
+            for column in self.numeric_columns:
+                if column in record:
+                    record[column] = self.to_number(record[column])
+            separator = ',\n    ' if self.records_written else '\n    '
+            self.file.write(separator + json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    '))
+            self.records_written += 1
+
+    def close(self):
+        self.file.write('\n]' if self.records_written else ']')
+        self.file.close()
+
+
+class ParquetSink:
+    """Streams scored chunks into a Parquet file, one row group per chunk.
+
+    Sentiment scores are stored as float32, subreddit and overall_sentiment as dictionary-encoded
+    (categorical) strings. Needs pyarrow, which is only imported when this sink is used.
+    """
+
+    name = 'write_parquet'
+    FLOAT_COLUMNS = ('neg_sentiment', 'neu_sentiment', 'pos_sentiment', 'compound_sentiment')
+    CATEGORICAL_COLUMNS = ('subreddit', 'overall_sentiment')
+    INTEGER_COLUMNS = ('num_comments',)
+
+    def __init__(self, file_path, compression='zstd'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow") from e
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.file_path = file_path
+        self.compression = compression
+        self.writer = None
+
+    def to_table(self, df):
+        import pandas as pd
+        pa = self.pa
+        arrays = {}
+        for column in df.columns:
+            if column in self.FLOAT_COLUMNS:
+                arrays[column] = pa.array(df[column].to_numpy(dtype=np.float32), type=pa.float32())
+            elif column in self.CATEGORICAL_COLUMNS:
+                arrays[column] = pa.array(df[column].astype(str), type=pa.string()).dictionary_encode()
+            elif column in self.INTEGER_COLUMNS:
+                arrays[column] = pa.array(pd.to_numeric(df[column], errors='coerce').astype('Int64'), type=pa.int64())
+            else:
+                arrays[column] = pa.array(df[column].astype(str), type=pa.string())
+        return pa.table(arrays)
+
+    def write(self, df):
+        table = self.to_table(df)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.file_path, table.schema, compression=self.compression)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class RollupSink:
+    """Accumulates per-subreddit, hourly sentiment stats of one input file into a SentimentRollup.
+
+    The file's rollup is stored by commit(), which the caller runs only once the whole file went through
+    the pipeline; it then replaces any earlier one for the same source. Closing without a commit (e.g.
+    after a failed run) leaves the stored rollup untouched.
+    """
+
+    name = 'rollup'
+
+    def __init__(self, rollup, source):
+        self.rollup = rollup
+        self.source = source
+        self.stats = {}
+
+    def write(self, df):
+        for key, stats in SentimentRollup.summarize(df).items():
+            if key in self.stats:
+                self.stats[key].merge(stats)
+            else:
+                self.stats[key] = stats
+
+    def commit(self):
+        self.rollup.replace_source(self.source, self.stats)
+
+    def close(self):
+        pass
+
+
+class StageTimer:
+    """Accumulates the wall time spent in each pipeline stage, excluding time spent in the stages feeding it."""
+
+    def __init__(self):
+        self.totals = OrderedDict()
+        self.stack = []
+
+    def timed(self, name, iterable):
+        """Wraps a chunk iterator so time spent producing each chunk is charged to name."""
+        iterator = iter(iterable)
+        while True:
+            self.stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record(name, start)
+                return
+            self.record(name, start)
+            yield item
+
+    @contextmanager
+    def stage(self, name):
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def record(self, name, start):
+        elapsed = time.perf_counter() - start
+        nested = self.stack.pop()
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed - nested
+        if self.stack:
+            self.stack[-1] += elapsed
+
+    def report(self):
+        return ', '.join(f"{name} {seconds:.2f}s" for name, seconds in self.totals.items())
+
+
+class SentimentPipeline:
+    """One pass over an input CSV: read -> dedup -> score -> fan out to every sink, a chunk at a time.
+
+    Only one chunk per stage (plus the chunks queued for scoring workers) is held in memory.
+    """
+
+    def __init__(self, input_file_path, analyzer, sinks, deduplicator=None, chunk_size=10000, workers=1,
+                 timer=None, near_duplicate_detector=None):
+        self.input_file_path = input_file_path
+        self.analyzer = analyzer
+        self.sinks = sinks
+        self.deduplicator = deduplicator
+        self.near_duplicate_detector = near_duplicate_detector
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.timer = timer or StageTimer()
+
+    def read_chunks(self):
+        import pandas as pd
+        # Read every column as text so values round-trip unchanged, like csv.DictReader did
+        return pd.read_csv(self.input_file_path, chunksize=self.chunk_size, dtype=str, keep_default_na=False,
+                           encoding='utf-8')
+
+    def run(self):
+        try:
+            chunks = self.timer.timed('read', self.read_chunks())
+            if self.deduplicator is not None:
+                chunks = self.timer.timed('dedup', (self.deduplicator.filter(chunk) for chunk in chunks))
+            if self.near_duplicate_detector is not None:
+                self.near_duplicate_detector.start_source(self.input_file_path)
+                chunks = self.timer.timed('near_dedup',
+                                          (self.near_duplicate_detector.filter(chunk) for chunk in chunks))
+            scored_chunks = self.timer.timed('score', self.analyzer.score_chunks(chunks, self.workers))
+            for scored in scored_chunks:
+                for sink in self.sinks:
+                    with self.timer.stage(sink.name):
+                        sink.write(scored)
+        finally:
+            for sink in self.sinks:
+                sink.close()
+        return self.timer
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate and score the scraped Reddit CSV files.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used for sentiment scoring (default: 1, no process pool)")
+    parser.add_argument('--cache-path', default="sentiment_cache.sqlite",
+                        help="SQLite file holding previously computed sentiment scores")
+    parser.add_argument('--no-cache', action='store_true', help="Score every row without consulting the cache")
+    parser.add_argument('--manifest-path', default="sentiment_manifest.json",
+                        help="JSON file recording which input files were already processed")
+    parser.add_argument('--reprocess', action='store_true', help="Process every input file, even unchanged ones")
+    parser.add_argument('--dedup-scope', choices=['file', 'folder'], default='file',
+                        help="Remove duplicates within each file, or across every file processed in this run")
+    parser.add_argument('--dedup-mode', choices=StreamingDeduplicator.MODES, default='exact',
+                        help="'exact' keeps every key hash; 'bloom' uses fixed memory with rare false positives")
+    parser.add_argument('--bloom-fp-rate', type=float, default=0.001,
+                        help="False-positive rate of the Bloom filter in --dedup-mode bloom")
+    parser.add_argument('--near-dup-threshold', type=float, default=None,
+                        help="Also drop reposts whose estimated Jaccard similarity to an earlier post is at least this")
+    parser.add_argument('--near-dup-index', default=None,
+                        help="Pickle file to load and save the near-duplicate index so later runs are checked against it")
+    parser.add_argument('--rollup-path', default="sentiment_rollup.sqlite",
+                        help="SQLite file holding the per-subreddit hourly sentiment rollups")
+    parser.add_argument('--no-rollup', action='store_true', help="Do not update the sentiment rollups")
+    parser.add_argument('--scorer', choices=SENTIMENT_SCORERS, default='fast',
+                        help="VADER implementation: 'fast' (default) or NLTK's own; the scores are identical")
+    parser.add_argument('--lexicon-cache', default="vader_lexicon.pickle",
+                        help="Pickled VADER lexicon the fast scorer loads instead of importing NLTK")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Also write the scored rows as Parquet next to the CSV output (needs pyarrow)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Define the folder where the CSV files are stored
     folder_path = "data"
 
@@ -121,33 +749,82 @@ def main():
     csv_columns = ['title', 'category', 'likes', 'num_comments', 'subreddit', 'view_count', 'selftext']
     csv_handler = CSVHandler(folder_path, csv_columns)
 
-    # Retrieve all CSV files in the folder
-    csv_files = csv_handler.get_all_csv_files()
-
+    # Retrieve the CSV files that are new or changed since the last run
+    manifest = ProcessedFilesManifest(args.manifest_path)
+    produced = manifest.outputs()
+    csv_files = [f for f in csv_handler.get_all_csv_files()
+                 if os.path.join(folder_path, f) not in produced
+                 and (args.reprocess or not manifest.is_processed(os.path.join(folder_path, f)))]
 
-    # Initialize JSON handler
-    json_handler = JSONHandler(folder_path)
 
-    for csv_file in csv_files:
-        print(f"Processing file: {csv_file}")
+    # Scores are cached across files and runs so re-crawled posts are not re-scored
+    sentiment_cache = None if args.no_cache else SentimentCache(args.cache_path)
 
-        # Read the CSV into a DataFrame
-        df = csv_handler.read_csv(csv_file)
+    # Hourly per-subreddit rollups, so dashboards query a small table instead of every output CSV
+    sentiment_rollup = None if args.no_rollup else SentimentRollup(args.rollup_path)
 
-        # Process the data: Remove duplicates
-        processor = DataProcessor(df)
-        processor.remove_duplicates(subset_columns=['title', 'selftext'])
+    def make_deduplicator():
+        return StreamingDeduplicator(['title', 'selftext'], mode=args.dedup_mode,
+                                     false_positive_rate=args.bloom_fp_rate)
 
-        # Save the cleaned DataFrame back to the original CSV
-        csv_handler.write_csv(processor.get_dataframe(), csv_file)
+    folder_deduplicator = make_deduplicator() if args.dedup_scope == 'folder' else None
 
-        # Perform sentiment analysis and write to a new CSV with the current timestamp
-        sentiment_analyzer = SentimentAnalyzer(os.path.join(folder_path, csv_file), folder_path)
-        sentiment_analyzer.analyze_and_update_csv()
+    # Near-duplicate detection always spans every file in the run (and earlier runs, with an index file)
+    near_duplicate_detector = None
+    if args.near_dup_index and os.path.exists(args.near_dup_index):
+        near_duplicate_detector = NearDuplicateDetector.load(args.near_dup_index)
+    elif args.near_dup_threshold is not None or args.near_dup_index:
+        near_duplicate_detector = NearDuplicateDetector(threshold=args.near_dup_threshold or 0.8)
 
-        # Save the sentiment-analyzed DataFrame to a JSON file
-        json_file_path = csv_file.replace('.csv', '.json')
-        json_handler.write_json(processor.get_dataframe().to_dict(orient='records'), json_file_path)
+    for csv_file in csv_files:
+        print(f"Processing file: {csv_file}")
+        input_path = os.path.join(folder_path, csv_file)
+        json_file_path = os.path.join(folder_path, csv_file.replace('.csv', '.json'))
+
+        # Read, remove duplicates, score and write the CSV and JSON outputs in a single pass
+        sentiment_analyzer = SentimentAnalyzer(input_path, folder_path, cache=sentiment_cache,
+                                               scorer=args.scorer, lexicon_cache_path=args.lexicon_cache)
+        deduplicator = folder_deduplicator or make_deduplicator()
+        duplicates_before = deduplicator.duplicates_dropped
+        near_duplicates_before = near_duplicate_detector.duplicates_dropped if near_duplicate_detector is not None else 0
+        sinks = [CSVSink(sentiment_analyzer.updated_file_path), JSONSink(json_file_path)]
+        outputs = [sentiment_analyzer.updated_file_path, json_file_path]
+        if args.parquet:
+            parquet_file_path = sentiment_analyzer.updated_file_path.replace('.csv', '.parquet')
+            sinks.append(ParquetSink(parquet_file_path))
+            outputs.append(parquet_file_path)
+        rollup_sink = None
+        if sentiment_rollup is not None:
+            rollup_sink = RollupSink(sentiment_rollup, input_path)
+            sinks.append(rollup_sink)
+        pipeline = SentimentPipeline(input_path, sentiment_analyzer, sinks,
+                                     deduplicator=deduplicator,
+                                     near_duplicate_detector=near_duplicate_detector,
+                                     workers=args.workers)
+        timer = pipeline.run()
+        if rollup_sink is not None:
+            rollup_sink.commit()
+        print(f"Stage timings: {timer.report()}")
+        print(f"Duplicates removed: {deduplicator.duplicates_dropped - duplicates_before}")
+        if near_duplicate_detector is not None:
+            print(f"Near-duplicates removed: {near_duplicate_detector.duplicates_dropped - near_duplicates_before}")
+
+        manifest.record(input_path, outputs)
+        manifest.save()
+
+    # Persist mtime refreshes from is_processed even when nothing needed processing
+    manifest.save()
+
+    if near_duplicate_detector is not None and args.near_dup_index:
+        near_duplicate_detector.save(args.near_dup_index)
+
+    if sentiment_cache is not None:
+        stats = sentiment_cache.stats()
+        print(f"Sentiment cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+        sentiment_cache.close()
+
+    if sentiment_rollup is not None:
+        sentiment_rollup.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+#Done By Dacorie Smith
+
+import argparse
+import csv
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+
+class RunningStats:
+    """Count, mean and sum of squared deviations (M2) of compound scores, plus good/bad/neutral counts.
+
+    Two instances merge exactly with Chan et al.'s parallel form of Welford's update, so
+    rollups of different chunks, files and runs combine without revisiting any rows.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'good', 'bad', 'neutral')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, good=0, bad=0, neutral=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.good = good
+        self.bad = bad
+        self.neutral = neutral
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.good += other.good
+        self.bad += other.bad
+        self.neutral += other.neutral
+        return self
+
+    @property
+    def variance(self):
+        """Population variance of the compound scores."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def as_row(self):
+        return self.count, self.mean, self.m2, self.good, self.bad, self.neutral
+
+
+class SentimentRollup:
+    """Per-subreddit, hourly rollups of the scored posts in a SQLite table.
+
+    Rows are kept per source file, so reprocessing a file replaces its contribution instead of
+    counting it twice. Day (or coarser) buckets and totals over several files are merged from the
+    hourly rows when queried, which keeps dashboards off the row-level CSV files.
+    """
+
+    BUCKET_SECONDS = {'hour': 3600, 'day': 86400}
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_rollup ("
+            "source TEXT NOT NULL, subreddit TEXT NOT NULL, bucket_start INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, mean REAL NOT NULL, m2 REAL NOT NULL, "
+            "good INTEGER NOT NULL, bad INTEGER NOT NULL, neutral INTEGER NOT NULL, "
+            "PRIMARY KEY (source, subreddit, bucket_start))")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS sentiment_rollup_by_bucket ON sentiment_rollup (subreddit, bucket_start)")
+
+    @classmethod
+    def summarize(cls, df):
+        """Returns {(subreddit, hour_start): RunningStats} for a scored chunk.
+
+        Rows without a usable created_utc (e.g. CSVs scraped before it was kept) are left out.
+        """
+        import pandas as pd
+
+        if 'created_utc' not in df.columns or df.empty:
+            return {}
+        created_utc = pd.to_numeric(df['created_utc'], errors='coerce')
+        known = created_utc.notna().to_numpy()
+        if not known.any():
+            return {}
+        hour = cls.BUCKET_SECONDS['hour']
+        frame = pd.DataFrame({
+            'subreddit': df['subreddit'].to_numpy()[known],
+            'bucket_start': (created_utc.to_numpy()[known] // hour * hour).astype('int64'),
+            'compound': pd.to_numeric(df['compound_sentiment'], errors='coerce').to_numpy()[known],
+            'overall': df['overall_sentiment'].to_numpy()[known],
+        })
+        grouped = frame.groupby(['subreddit', 'bucket_start'], sort=False)
+        counts = grouped['compound'].count()
+        means = grouped['compound'].mean()
+        m2 = grouped['compound'].var(ddof=0).fillna(0.0) * counts
+        labels = (frame.groupby(['subreddit', 'bucket_start', 'overall'], sort=False).size().unstack(fill_value=0)
+                  .reindex(index=counts.index, columns=['good', 'bad', 'neutral'], fill_value=0))
+        return {key: RunningStats(int(count), float(mean), float(squares), int(good), int(bad), int(neutral))
+                for key, count, mean, squares, good, bad, neutral in zip(
+                    counts.index, counts, means, m2, labels['good'], labels['bad'], labels['neutral'])}
+
+    def replace_source(self, source, stats_by_key):
+        """Stores the rollup of one source file, replacing what an earlier run stored for it."""
+        with self.connection:
+            self.connection.execute("DELETE FROM sentiment_rollup WHERE source = ?", (source,))
+            self.connection.executemany(
+                "INSERT INTO sentiment_rollup (source, subreddit, bucket_start, count, mean, m2, good, bad, neutral) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(source, subreddit, bucket_start, *stats.as_row())
+                 for (subreddit, bucket_start), stats in stats_by_key.items()])
+
+    def query(self, granularity='day', subreddit=None, start=None, end=None):
+        """Returns merged rollups per (subreddit, bucket), optionally for one subreddit and [start, end) in epoch seconds."""
+        if granularity not in self.BUCKET_SECONDS:
+            raise ValueError(f"Unknown granularity '{granularity}', expected one of {tuple(self.BUCKET_SECONDS)}")
+        conditions, params = [], []
+        if subreddit is not None:
+            conditions.append("subreddit = ?")
+            params.append(subreddit)
+        if start is not None:
+            conditions.append("bucket_start >= ?")
+            params.append(int(start))
+        if end is not None:
+            conditions.append("bucket_start < ?")
+            params.append(int(end))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT subreddit, bucket_start, count, mean, m2, good, bad, neutral FROM sentiment_rollup{where}", params)
+
+        seconds = self.BUCKET_SECONDS[granularity]
+        merged = {}
+        for row_subreddit, bucket_start, *stats in rows:
+            key = (row_subreddit, bucket_start // seconds * seconds)
+            merged.setdefault(key, RunningStats()).merge(RunningStats(*stats))
+        return [{
+            'subreddit': row_subreddit,
+            'bucket_start': datetime.fromtimestamp(bucket_start, timezone.utc).isoformat(),
+            'count': stats.count,
+            'mean_compound': stats.mean,
+            'variance_compound': stats.variance,
+            'good': stats.good,
+            'bad': stats.bad,
+            'neutral': stats.neutral,
+        } for (row_subreddit, bucket_start), stats in sorted(merged.items())]
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print sentiment rollups per subreddit and time bucket as CSV")
+    parser.add_argument('--rollup-path', default="sentiment_rollup.sqlite")
+    parser.add_argument('--granularity', choices=list(SentimentRollup.BUCKET_SECONDS), default='day')
+    parser.add_argument('--subreddit', default=None)
+    args = parser.parse_args(argv)
+
+    rollup = SentimentRollup(args.rollup_path)
+    rows = rollup.query(args.granularity, args.subreddit)
+    rollup.close()
+    writer = csv.DictWriter(sys.stdout, fieldnames=['subreddit', 'bucket_start', 'count', 'mean_compound',
+                                                    'variance_compound', 'good', 'bad', 'neutral'])
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import RateLimiter, RedditAPI
+
+
+class FakeClock:
+    """A monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_reddit():
+    with FakeRedditServer(latency=0.0, page_size=10, pages_per_listing=5) as fake:
+        yield fake
+
+
+def make_api(fake, rate_limiter=None, **kwargs):
+    """A RedditAPI pointed at a FakeRedditServer, with short backoffs."""
+    return RedditAPI('client-id', 'client-secret', 'tests/0.0.1', base_url=fake.base_url, auth_url=fake.auth_url,
+                     rate_limiter=rate_limiter or RateLimiter(1000000), backoff_factor=0.01, **kwargs)
@@ -0,0 +1,107 @@
+import json
+import zlib
+
+import pytest
+
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import CrawlCheckpoint, JobHuntingPostScraper
+from tests.conftest import make_api
+
+
+def created_utc(position):
+    return FakeRedditServer.CREATED_UTC - position * 60
+
+
+def fullname(position, listing='jobs/new'):
+    return f"t3_{zlib.crc32(listing.encode('utf-8')):x}_{position}"
+
+
+def positions(pages):
+    """Positions in the fake listing of the posts a crawl yields."""
+    return [int(child['data']['name'].rpartition('_')[2]) for page in pages for child in page['data']['children']]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return CrawlCheckpoint(str(tmp_path / 'checkpoint.json'))
+
+
+def test_update_keeps_the_newest_post(checkpoint):
+    checkpoint.update('search:python', 't3_b', 200.0)
+    checkpoint.update('search:python', 't3_a', 100.0)
+    assert checkpoint.get('search:python') == {'fullname': 't3_b', 'created_utc': 200.0}
+
+
+def test_suspend_keeps_the_newest_post_of_the_interrupted_crawl(checkpoint):
+    checkpoint.update('search:python', 't3_old', 100.0)
+    checkpoint.suspend('search:python', 't3_p9', 't3_p0', 300.0)
+    # The continued crawl only sees older posts: the cursor moves, the newest post stays
+    checkpoint.suspend('search:python', 't3_p19', 't3_p10', 250.0)
+    assert checkpoint.resume_cursor('search:python') == 't3_p19'
+    assert checkpoint.get('search:python')['resume'] == {'after': 't3_p19', 'fullname': 't3_p0', 'created_utc': 300.0}
+    assert checkpoint.get('search:python')['fullname'] == 't3_old'
+
+
+def test_update_with_an_older_post_ends_the_interrupted_crawl(checkpoint):
+    checkpoint.update('search:python', 't3_old', 100.0)
+    checkpoint.suspend('search:python', 't3_p9', 't3_p0', 300.0)
+    checkpoint.update('search:python', 't3_p0', 300.0)
+    assert checkpoint.get('search:python') == {'fullname': 't3_p0', 'created_utc': 300.0}
+    assert checkpoint.resume_cursor('search:python') is None
+
+
+def test_save_and_reload(checkpoint, tmp_path):
+    checkpoint.update('search:python', 't3_a', 100.0)
+    checkpoint.save()
+    checkpoint.update('search:python', 't3_b', 200.0)
+    checkpoint.reload()
+    assert checkpoint.get('search:python') == {'fullname': 't3_a', 'created_utc': 100.0}
+    assert json.loads((tmp_path / 'checkpoint.json').read_text()) == {'search:python': checkpoint.get('search:python')}
+    assert not (tmp_path / 'checkpoint.json.tmp').exists()
+
+
+def make_scraper(fake, tmp_path, **kwargs):
+    return JobHuntingPostScraper(None, None, None, str(tmp_path / 'crawl.csv'), ['jobs'], api=make_api(fake),
+                                 checkpoint_path=str(tmp_path / 'checkpoint.json'), **kwargs)
+
+
+def test_first_crawl_moves_the_checkpoint_to_the_newest_post(fake_reddit, tmp_path):
+    scraper = make_scraper(fake_reddit, tmp_path, subreddit_sort='new', max_pages=2)
+    assert positions(scraper.subreddit_pages('jobs')) == list(range(20))
+    assert scraper.checkpoint.get('subreddit:jobs') == {'fullname': fullname(0), 'created_utc': created_utc(0)}
+
+
+def test_crawl_stops_at_the_checkpoint(fake_reddit, tmp_path):
+    scraper = make_scraper(fake_reddit, tmp_path, subreddit_sort='new', max_pages=5)
+    scraper.checkpoint.update('subreddit:jobs', fullname(15), created_utc(15))
+    assert positions(scraper.subreddit_pages('jobs')) == list(range(15))
+    assert fake_reddit.stats['requests'] == 1 + 2  # the token, then two pages
+    assert scraper.checkpoint.get('subreddit:jobs') == {'fullname': fullname(0), 'created_utc': created_utc(0)}
+
+
+def test_crawl_cut_short_by_max_pages_resumes_where_it_stopped(fake_reddit, tmp_path):
+    scraper = make_scraper(fake_reddit, tmp_path, subreddit_sort='new', max_pages=1)
+    scraper.checkpoint.update('subreddit:jobs', fullname(30), created_utc(30))
+
+    runs = [positions(scraper.subreddit_pages('jobs')) for _ in range(4)]
+    assert runs == [list(range(0, 10)), list(range(10, 20)), list(range(20, 30)), []]
+    # The gap is closed: the newest post of the first run becomes the checkpoint
+    assert scraper.checkpoint.get('subreddit:jobs') == {'fullname': fullname(0), 'created_utc': created_utc(0)}
+    assert positions(scraper.subreddit_pages('jobs')) == []
+
+
+def test_resume_survives_a_restart(fake_reddit, tmp_path):
+    scraper = make_scraper(fake_reddit, tmp_path, subreddit_sort='new', max_pages=1)
+    scraper.checkpoint.update('subreddit:jobs', fullname(30), created_utc(30))
+    assert positions(scraper.subreddit_pages('jobs')) == list(range(0, 10))
+    scraper.checkpoint.save()
+
+    restarted = make_scraper(fake_reddit, tmp_path, subreddit_sort='new', max_pages=1)
+    assert positions(restarted.subreddit_pages('jobs')) == list(range(10, 20))
+
+
+def test_listing_that_is_not_newest_first_never_suspends(fake_reddit, tmp_path):
+    scraper = make_scraper(fake_reddit, tmp_path, subreddit_sort='top', max_pages=1)
+    scraper.checkpoint.update('subreddit:jobs', fullname(30, 'jobs/top'), created_utc(30))
+    assert positions(scraper.subreddit_pages('jobs')) == list(range(0, 10))
+    assert scraper.checkpoint.get('subreddit:jobs') == {'fullname': fullname(0, 'jobs/top'), 'created_utc': created_utc(0)}
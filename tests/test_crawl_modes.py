@@ -0,0 +1,81 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import JobHuntingPostScraper
+from tests.conftest import make_api
+
+SUBREDDITS = ['jobs', 'careerguidance', 'resumes', 'interviews', 'remotework', 'freelance']
+
+
+def track_concurrency(fake, monkeypatch):
+    """Records the most listing requests the fake server was handling at once."""
+    respond = fake.respond
+    lock = threading.Lock()
+    counts = {'active': 0, 'peak': 0}
+
+    def tracked(handler, method, path):
+        if method != 'GET':
+            return respond(handler, method, path)
+        with lock:
+            counts['active'] += 1
+            counts['peak'] = max(counts['peak'], counts['active'])
+        try:
+            return respond(handler, method, path)
+        finally:
+            with lock:
+                counts['active'] -= 1
+
+    monkeypatch.setattr(fake, 'respond', tracked)
+    return counts
+
+
+def crawl(fake, tmp_path, fetch_mode, subreddits=SUBREDDITS, **kwargs):
+    scraper = JobHuntingPostScraper(None, None, None, str(tmp_path / f'{fetch_mode}.csv'), subreddits,
+                                    fetch_mode=fetch_mode, api=make_api(fake), max_pages=2, **kwargs)
+    scraper.fetch_and_store_posts()
+    return scraper, pd.read_csv(scraper.csv_file_path, dtype=str, keep_default_na=False)
+
+
+@pytest.fixture
+def slow_reddit():
+    with FakeRedditServer(latency=0.05, latency_jitter=0.05, page_size=10, pages_per_listing=3) as fake:
+        yield fake
+
+
+def test_both_fetch_modes_write_the_same_posts(slow_reddit, tmp_path):
+    _, sequential = crawl(slow_reddit, tmp_path, 'sequential')
+    _, threaded = crawl(slow_reddit, tmp_path, 'threads')
+    assert len(sequential) > 0
+    key = ['subreddit', 'fullname']
+    assert sequential.sort_values(key).reset_index(drop=True).equals(threaded.sort_values(key).reset_index(drop=True))
+    # Every subreddit is crawled, two pages each
+    assert set(threaded['subreddit']) == set(SUBREDDITS)
+    assert slow_reddit.stats['requests'] == 2 * (1 + 2 * len(SUBREDDITS))
+
+
+def test_sequential_mode_sends_one_request_at_a_time(slow_reddit, tmp_path, monkeypatch):
+    counts = track_concurrency(slow_reddit, monkeypatch)
+    crawl(slow_reddit, tmp_path, 'sequential')
+    assert counts['peak'] == 1
+
+
+def test_threads_mode_overlaps_requests_up_to_max_in_flight(slow_reddit, tmp_path, monkeypatch):
+    counts = track_concurrency(slow_reddit, monkeypatch)
+    crawl(slow_reddit, tmp_path, 'threads', max_in_flight=3)
+    assert 1 < counts['peak'] <= 3
+
+
+@pytest.mark.parametrize('fetch_mode', JobHuntingPostScraper.FETCH_MODES)
+def test_failing_item_is_skipped(slow_reddit, tmp_path, fetch_mode, capsys):
+    scraper, written = crawl(slow_reddit, tmp_path, fetch_mode, subreddits=['jobs', 'no/such/listing', 'resumes'])
+    assert set(written['subreddit']) == {'jobs', 'resumes'}
+    assert "Error fetching or filtering posts for subreddit no/such/listing" in capsys.readouterr().out
+
+
+def test_unknown_fetch_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        JobHuntingPostScraper(None, None, None, str(tmp_path / 'crawl.csv'), SUBREDDITS, fetch_mode='asyncio',
+                              api=object())
@@ -0,0 +1,46 @@
+import json
+
+import pandas as pd
+
+import data_collection_reddit_scrapper as scraper_module
+from data_collection_reddit_scrapper import CrawlWriter, JobHuntingPostScraper
+from tests.conftest import make_api
+
+
+def test_failed_write_is_raised_on_close():
+    def store(posts):
+        raise OSError("disk full")
+
+    writer = CrawlWriter(store, flush_every=1)
+    writer.start()
+    writer.put([{'title': 'a'}])
+    try:
+        writer.close()
+    except OSError as e:
+        assert str(e) == "disk full"
+    else:
+        raise AssertionError("close() did not raise the write error")
+
+
+def test_failed_write_does_not_move_the_saved_checkpoint(fake_reddit, tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    scraper = JobHuntingPostScraper(None, None, None, str(tmp_path / 'crawl.csv'), ['jobs'], api=make_api(fake_reddit),
+                                    subreddit_sort='new', checkpoint_path=str(checkpoint_path))
+
+    def write_fails(file_path, posts):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(scraper_module.CSVWriter, 'write_to_csv', staticmethod(write_fails))
+        scraper.fetch_and_store_posts()
+
+    # A later crawl on the same scraper saves the checkpoint, which must not claim the lost posts
+    scraper.search_and_store_posts(['python'])
+    saved = json.loads(checkpoint_path.read_text())
+    assert 'search:python' in saved
+    assert 'subreddit:jobs' not in saved
+
+    scraper.fetch_and_store_posts()
+    written = pd.read_csv(scraper.csv_file_path, dtype=str, keep_default_na=False)
+    assert (written['subreddit'] == 'jobs').sum() > 0
+    assert 'subreddit:jobs' in json.loads(checkpoint_path.read_text())
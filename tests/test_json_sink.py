@@ -0,0 +1,39 @@
+import json
+
+import pandas as pd
+
+from sentiment_analyzer import JSONSink
+
+CSV = """title,num_comments,subreddit,selftext,fullname,created_utc
+First,12,jobs,"Looking for advice, anyone?",t3_a,1700000000.0
+Second,0,resumes,Please review,t3_b,1699999940.0
+"""
+
+
+def write_json(df, path):
+    sink = JSONSink(str(path))
+    sink.write(df)
+    sink.close()
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def test_numbers_are_written_as_the_csv_holds_them(tmp_path):
+    (tmp_path / 'posts.csv').write_text(CSV)
+    # The pipeline reads every column as text; the baseline let pandas infer the types
+    as_text = pd.read_csv(tmp_path / 'posts.csv', dtype=str, keep_default_na=False)
+    inferred = pd.read_csv(tmp_path / 'posts.csv')
+    records = write_json(as_text, tmp_path / 'posts.json')
+    assert records == inferred.to_dict(orient='records')
+    assert isinstance(records[0]['created_utc'], float)
+    assert isinstance(records[0]['num_comments'], int)
+
+
+def test_integral_timestamps_and_missing_values(tmp_path):
+    df = pd.DataFrame({'num_comments': ['3', ''], 'created_utc': ['1700000000', 'soon']})
+    records = write_json(df, tmp_path / 'posts.json')
+    assert records == [{'num_comments': 3, 'created_utc': 1700000000}, {'num_comments': None, 'created_utc': 'soon'}]
+
+
+def test_empty_output_is_an_empty_array(tmp_path):
+    assert write_json(pd.DataFrame({'num_comments': []}), tmp_path / 'posts.json') == []
@@ -0,0 +1,35 @@
+import pickle
+
+from near_duplicate_detector import NearDuplicateDetector
+
+POST = "Looking for advice on switching careers from teaching to data analysis after ten years"
+
+
+def test_saved_index_keeps_the_source_of_every_post(tmp_path):
+    detector = NearDuplicateDetector()
+    detector.start_source('monday.csv')
+    detector.check_and_add(POST)
+    detector.start_source('tuesday.csv')
+    detector.check_and_add("Completely unrelated question about renting an apartment in Berlin this winter")
+    detector.save(str(tmp_path / 'index.pkl'))
+
+    loaded = NearDuplicateDetector.load(str(tmp_path / 'index.pkl'))
+    assert loaded.sources == ['monday.csv', 'tuesday.csv']
+    # Reprocessing monday.csv does not match its rows against themselves; other files still do
+    loaded.start_source('monday.csv')
+    assert loaded.check_and_add(POST) is None
+    loaded.start_source('wednesday.csv')
+    assert loaded.check_and_add(POST + '!') is not None
+
+
+def test_save_drops_retired_posts(tmp_path):
+    detector = NearDuplicateDetector()
+    detector.start_source('monday.csv')
+    detector.check_and_add(POST)
+    detector.start_source('monday.csv')
+    detector.check_and_add(POST)
+    detector.save(str(tmp_path / 'index.pkl'))
+    with open(tmp_path / 'index.pkl', 'rb') as file:
+        state = pickle.load(file)
+    assert state['sources'] == ['monday.csv']
+    assert len(NearDuplicateDetector.load(str(tmp_path / 'index.pkl'))) == 1
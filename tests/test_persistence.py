@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import stat
+
+import pytest
+
+from persistence import SQLITE_QUERY_BATCH_SIZE, atomic_write, query_in_batches
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text('old')
+    with atomic_write(str(path)) as file:
+        file.write('new')
+    assert path.read_text() == 'new'
+    assert not (tmp_path / 'state.json.tmp').exists()
+
+
+def test_failed_atomic_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file:
+            file.write('half')
+            raise RuntimeError("interrupted")
+    assert path.read_text() == 'old'
+
+
+def test_atomic_write_binary_with_permissions(tmp_path):
+    path = tmp_path / 'token.bin'
+    with atomic_write(str(path), 'wb', permissions=0o600) as file:
+        file.write(b'\x00secret')
+    assert path.read_bytes() == b'\x00secret'
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_query_in_batches_returns_every_match():
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE seen (key TEXT PRIMARY KEY)")
+    connection.executemany("INSERT INTO seen VALUES (?)", [(str(i),) for i in range(0, 3000, 2)])
+    keys = [str(i) for i in range(3 * SQLITE_QUERY_BATCH_SIZE + 7)]
+    rows = query_in_batches(connection, "SELECT key FROM seen WHERE key IN ({placeholders})", keys)
+    assert sorted(int(key) for key, in rows) == list(range(0, len(keys), 2))
+    assert list(query_in_batches(connection, "SELECT key FROM seen WHERE key IN ({placeholders})", [])) == []
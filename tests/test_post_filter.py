@@ -0,0 +1,35 @@
+import sys
+
+import pytest
+
+from data_collection_reddit_scrapper import PostFilter
+
+# Short and mixed texts are where langdetect's random sampling disagrees with itself between runs
+AMBIGUOUS_TEXTS = [
+    "ok merci thanks",
+    "Job offer in Berlin, danke schön for any tips",
+    "Hola, need help with my resume por favor",
+    "ciao ciao",
+]
+
+
+def test_language_detection_is_deterministic():
+    langdetect = pytest.importorskip('langdetect')
+    post_filter = PostFilter(min_length=0, languages=['en'])
+    assert langdetect.DetectorFactory.seed == 0
+    first = [post_filter.detect_language(text) for text in AMBIGUOUS_TEXTS]
+    for _ in range(20):
+        assert [post_filter.detect_language(text) for text in AMBIGUOUS_TEXTS] == first
+
+
+def test_language_filter_needs_langdetect(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'langdetect', None)
+    with pytest.raises(ImportError, match="pip install langdetect"):
+        PostFilter(languages=['en'])
+
+
+def test_without_languages_langdetect_is_not_needed(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'langdetect', None)
+    post_filter = PostFilter(min_length=5)
+    assert post_filter.accepts({'selftext': 'long enough text'})
+    assert not post_filter.accepts({'selftext': 'short'})
@@ -0,0 +1,139 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from benchmarks.fake_reddit_server import FakeRedditServer
+from data_collection_reddit_scrapper import RateLimiter
+from tests.conftest import make_api
+
+
+def headers(remaining, reset, used):
+    return {'X-Ratelimit-Remaining': str(remaining), 'X-Ratelimit-Reset': str(reset), 'X-Ratelimit-Used': str(used)}
+
+
+def make_limiter(clock, capacity=10, period=60):
+    return RateLimiter(capacity, period=period, clock=clock, sleep=clock.sleep)
+
+
+def test_first_sync_subtracts_requests_still_in_flight(clock):
+    limiter = make_limiter(clock)
+    windows = [limiter.acquire() for _ in range(3)]
+    # The server has counted only the first request; the other two are still on their way
+    limiter.update(headers(9, 30, 1), windows[0])
+    assert limiter.in_flight == 2
+    assert limiter.remaining == 7
+
+
+def test_reset_is_rounded_up_and_padded(clock):
+    limiter = make_limiter(clock)
+    limiter.update(headers(9, 29, 1), limiter.acquire())
+    assert limiter.reset_at == clock() + 29 + 1 + limiter.reset_margin
+    # A later report of the same window never moves the estimate earlier than needed
+    limiter.update(headers(8, 28.6, 2), limiter.acquire())
+    assert limiter.reset_at == clock() + 28 + 1 + limiter.reset_margin
+
+
+def test_exhausted_quota_waits_for_reset_then_probes(clock):
+    limiter = make_limiter(clock)
+    limiter.update(headers(0, 30, 10), limiter.acquire())
+    reset_at = limiter.reset_at
+
+    probe_window = limiter.acquire()
+    assert clock() >= reset_at
+    assert limiter.probing
+    # No refill until the server confirms the new window
+    assert limiter.reserve(clock()) == limiter.probe_poll_interval
+
+    limiter.update(headers(59, 600, 1), probe_window)
+    assert not limiter.probing
+    assert limiter.remaining == 59
+    assert limiter.capacity == 60
+
+
+def test_responses_from_an_earlier_window_are_ignored(clock):
+    limiter = make_limiter(clock)
+    old_window = limiter.acquire()
+    limiter.update(headers(5, 10, 5), limiter.acquire())
+    clock.sleep(20)
+    probe_window = limiter.acquire()
+    limiter.update(headers(59, 600, 1), probe_window)
+    # The old request might not have been counted yet, so it is held back from the new window
+    assert limiter.remaining == 58
+
+    limiter.update(headers(0, 0, 10), old_window)
+    assert limiter.remaining == 58
+    assert limiter.in_flight == 0
+
+
+def test_spreads_remaining_quota_over_the_window(clock):
+    limiter = make_limiter(clock)
+    limiter.update(headers(4, 9, 6), limiter.acquire())
+    start, reset_at = clock(), limiter.reset_at
+    sent_at = []
+    for _ in range(4):
+        limiter.acquire()
+        sent_at.append(clock())
+    # The first slot is immediate and the other three are spread evenly up to the (padded) reset
+    assert sent_at[0] == start
+    gaps = [later - earlier for earlier, later in zip(sent_at, sent_at[1:])]
+    assert gaps == pytest.approx([(reset_at - start) / 3] * 3)
+
+
+def test_released_probe_lets_another_request_probe(clock):
+    limiter = make_limiter(clock)
+    limiter.update(headers(0, 30, 10), limiter.acquire())
+    probe_window = limiter.acquire()
+    limiter.release(probe_window)
+    assert limiter.in_flight == 0
+    assert limiter.reserve(clock()) is None
+
+
+def test_release_outside_a_probe_keeps_the_slot_spent(clock):
+    limiter = make_limiter(clock)
+    limiter.update(headers(5, 30, 5), limiter.acquire())
+    window = limiter.acquire()
+    limiter.release(window)
+    assert limiter.remaining == 4
+    assert limiter.in_flight == 0
+
+
+def test_probe_failing_with_any_error_does_not_hang_the_crawl(fake_reddit, clock):
+    limiter = RateLimiter(60, period=600, clock=clock, sleep=clock.sleep)
+    api = make_api(fake_reddit, rate_limiter=limiter)
+    url = f"{fake_reddit.base_url}/r/jobs/new"
+    assert api.request('GET', url, authorized=True).status_code == 200
+
+    # The window runs out, so the next request probes the new one; its body fails to decode
+    clock.sleep(700)
+    send = api.session.request
+
+    def broken_body(*args, **kwargs):
+        api.session.request = send
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+
+    api.session.request = broken_body
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        api.request('GET', url, authorized=True)
+    assert limiter.in_flight == 0
+
+    statuses = []
+    thread = threading.Thread(target=lambda: statuses.append(api.request('GET', url, authorized=True).status_code),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert statuses == [200]
+    api.close()
+
+
+@pytest.mark.parametrize('threads', [1, 8])
+def test_stays_within_the_server_quota(threads):
+    with FakeRedditServer(latency=0.005, latency_jitter=0.01, rate_limit=5, rate_limit_window=1) as fake:
+        api = make_api(fake, rate_limiter=RateLimiter(5, period=1))
+        url = f"{fake.base_url}/r/jobs/new"
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(lambda _: api.request('GET', url, authorized=True).status_code, range(15)))
+        api.close()
+    assert statuses == [200] * 15
+    assert fake.stats['rate_limited'] == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment_analyzer import BloomFilter, HashSet64, StreamingDeduplicator
+
+
+def random_hashes(count, seed):
+    return np.random.default_rng(seed).integers(0, 2 ** 64, size=count, dtype=np.uint64)
+
+
+def test_hash_set_contains_exactly_what_was_added():
+    hashes = random_hashes(10000, seed=1)
+    others = random_hashes(10000, seed=2)
+    seen = HashSet64()
+    for batch in np.array_split(hashes, 37):
+        seen.add(batch)
+    assert seen.contains(hashes).all()
+    assert not seen.contains(np.setdiff1d(others, hashes)).any()
+    assert len(seen) == len(np.unique(hashes))
+
+
+def test_hash_set_keeps_few_runs():
+    seen = HashSet64()
+    for batch in np.array_split(random_hashes(100000, seed=3), 1000):
+        seen.add(batch)
+    assert len(seen.runs) <= 2 * int(np.log2(1000)) + 1
+    assert all((np.diff(run.astype(np.float64)) > 0).all() for run in seen.runs)
+
+
+def test_hash_set_empty():
+    seen = HashSet64()
+    seen.add(np.array([], dtype=np.uint64))
+    assert len(seen) == 0
+    assert not seen.contains(random_hashes(5, seed=4)).any()
+
+
+def test_hash_set_extreme_values():
+    seen = HashSet64()
+    extremes = np.array([0, 2 ** 63, 2 ** 64 - 1], dtype=np.uint64)
+    seen.add(extremes)
+    assert seen.contains(extremes).all()
+    assert not seen.contains(np.array([1, 2 ** 64 - 2], dtype=np.uint64)).any()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    hashes = random_hashes(20000, seed=5)
+    bloom = BloomFilter(20000)
+    for batch in np.array_split(hashes, 13):
+        bloom.add(batch)
+    assert bloom.contains(hashes).all()
+    assert len(bloom) == 20000
+
+
+def test_bloom_filter_false_positive_rate_at_capacity():
+    bloom = BloomFilter(20000, false_positive_rate=0.01)
+    bloom.add(random_hashes(20000, seed=6))
+    false_positive_rate = bloom.contains(random_hashes(100000, seed=7)).mean()
+    assert false_positive_rate < 0.02
+
+
+@pytest.mark.parametrize('mode', StreamingDeduplicator.MODES)
+def test_deduplicator_keeps_first_occurrence_across_chunks(mode):
+    dedup = StreamingDeduplicator(['title', 'selftext'], mode=mode, expected_rows=1000)
+    first = pd.DataFrame({'title': ['a', 'b', 'a'], 'selftext': ['x', 'x', 'x'], 'num_comments': [1, 2, 3]})
+    second = pd.DataFrame({'title': ['b', 'c', 'a'], 'selftext': ['x', 'x', 'y'], 'num_comments': [4, 5, 6]})
+    assert dedup.filter(first)['num_comments'].tolist() == [1, 2]
+    assert dedup.filter(second)['num_comments'].tolist() == [5, 6]
+    assert (dedup.rows_seen, dedup.duplicates_dropped) == (6, 2)
+
+
+def test_deduplicator_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        StreamingDeduplicator(['title'], mode='approximate')
@@ -0,0 +1,105 @@
+import os
+import stat
+import threading
+
+import data_collection_reddit_scrapper as scraper_module
+from tests.conftest import make_api
+
+
+class RejectedTokens:
+    """Stands in for the fake server's token set: every token is issued, none is accepted."""
+
+    def add(self, token):
+        pass
+
+    def __contains__(self, token):
+        return False
+
+
+def fetch(api, fake):
+    return api.request('GET', f"{fake.base_url}/r/jobs/new", authorized=True, params={'limit': 1})
+
+
+def test_token_is_reused_until_it_is_about_to_expire(fake_reddit, clock, monkeypatch):
+    monkeypatch.setattr(scraper_module.time, 'time', clock)
+    api = make_api(fake_reddit, token_refresh_margin=300)
+    fetch(api, fake_reddit)
+    clock.sleep(3600 - 300 - 1)
+    assert fetch(api, fake_reddit).status_code == 200
+    assert fake_reddit.stats['tokens_issued'] == 1
+
+    clock.sleep(1)
+    assert fetch(api, fake_reddit).status_code == 200
+    assert fake_reddit.stats['tokens_issued'] == 2
+    assert fake_reddit.stats['unauthorized'] == 0
+
+
+def test_rejected_token_is_refreshed_once(fake_reddit):
+    api = make_api(fake_reddit)
+    fake_reddit.tokens.clear()
+    assert fetch(api, fake_reddit).status_code == 200
+    assert fake_reddit.stats['tokens_issued'] == 2
+    assert fake_reddit.stats['unauthorized'] == 1
+
+
+def test_token_rejected_again_after_refresh_is_returned(fake_reddit, monkeypatch):
+    api = make_api(fake_reddit, max_retries=3)
+    monkeypatch.setattr(fake_reddit, 'tokens', RejectedTokens())
+    assert fetch(api, fake_reddit).status_code == 401
+    assert fake_reddit.stats['tokens_issued'] == 2
+    assert fake_reddit.stats['unauthorized'] == 2
+
+
+def test_only_one_thread_refreshes_an_expiring_token(fake_reddit, clock, monkeypatch):
+    monkeypatch.setattr(scraper_module.time, 'time', clock)
+    api = make_api(fake_reddit)
+    clock.sleep(3600)
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(fetch(api, fake_reddit).status_code))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 8
+    assert fake_reddit.stats['tokens_issued'] == 2
+
+
+def test_cached_token_skips_authentication(fake_reddit, tmp_path):
+    cache_path = str(tmp_path / 'token.json')
+    first = make_api(fake_reddit, token_cache_path=cache_path)
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+    second = make_api(fake_reddit, token_cache_path=cache_path)
+    assert second.access_token == first.access_token
+    assert fetch(second, fake_reddit).status_code == 200
+    assert fake_reddit.stats['tokens_issued'] == 1
+
+
+def test_cached_token_about_to_expire_is_not_used(fake_reddit, tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(scraper_module.time, 'time', clock)
+    cache_path = str(tmp_path / 'token.json')
+    make_api(fake_reddit, token_cache_path=cache_path, token_refresh_margin=300)
+    clock.sleep(3600 - 300 - 1)
+    make_api(fake_reddit, token_cache_path=cache_path, token_refresh_margin=300)
+    assert fake_reddit.stats['tokens_issued'] == 1
+
+    clock.sleep(1)
+    make_api(fake_reddit, token_cache_path=cache_path, token_refresh_margin=300)
+    assert fake_reddit.stats['tokens_issued'] == 2
+
+
+def test_cached_token_of_another_client_is_not_used(fake_reddit, tmp_path):
+    cache_path = str(tmp_path / 'token.json')
+    make_api(fake_reddit, token_cache_path=cache_path)
+    scraper_module.RedditAPI('other-client', 'client-secret', 'tests/0.0.1', base_url=fake_reddit.base_url,
+                             auth_url=fake_reddit.auth_url, token_cache_path=cache_path)
+    assert fake_reddit.stats['tokens_issued'] == 2
+
+
+def test_unreadable_cache_falls_back_to_authentication(fake_reddit, tmp_path):
+    cache_path = tmp_path / 'token.json'
+    cache_path.write_text('{not json')
+    api = make_api(fake_reddit, token_cache_path=str(cache_path))
+    assert fetch(api, fake_reddit).status_code == 200
+    assert fake_reddit.stats['tokens_issued'] == 1